@@ -7,12 +7,70 @@
 # License: Apache 2.0
 #
 import ast
+from itertools import zip_longest
 try:
     from astunparse import unparse as dump
 except ImportError:
     from ast import dump
 
 
+def _rewrite_unary(node):
+    # Double negation `--e` is the only unary rule; nodes without a match simply fall through, so
+    # there is no need for a catch-all `case x: return x` arm binding the node a second time.
+    if isinstance(node.op, ast.USub):
+        operand = node.operand
+        if isinstance(operand, ast.UnaryOp) and isinstance(operand.op, ast.USub):
+            return operand.operand
+    return node
+
+
+_ADD_SUB = (ast.Add, ast.Sub)
+_MUL_DIV = (ast.Mult, ast.Div)
+
+
+def _num_value(node):
+    """
+    Return the numeric value of a number literal, or `None` if the node is not one.
+    """
+    if isinstance(node, ast.Num):
+        return node.n
+    return None
+
+
+def _rewrite_binop(node):
+    # These rules used to be match arms of the form `case ast.BinOp(e, ast.Add|ast.Sub,
+    # ast.Num(0))`; each arm re-ran the class pattern machinery per visited BinOp.  The checks
+    # below are the same rules in the same order, with the constant tests done directly.
+    op, left, right = node.op, node.left, node.right
+    r = _num_value(right)
+    if r == 0:
+        if isinstance(op, _ADD_SUB):
+            return left
+        if isinstance(op, ast.Mult):
+            return right
+    if r == 1 and isinstance(op, _MUL_DIV):
+        return left
+    if r is not None:
+        l = _num_value(left)
+        if l is not None:
+            if isinstance(op, ast.Add):
+                return ast.Num(l + r)
+            if isinstance(op, ast.Sub):
+                return ast.Num(l - r)
+    if isinstance(op, ast.Sub) and isinstance(left, ast.Name) and isinstance(right, ast.Name) \
+            and left.id == right.id:
+        return ast.Num(0)
+    return node
+
+
+# Only these two node types have rewrite rules at all; dispatching on `type(node)` up front means
+# that all other nodes skip the pattern-matching machinery entirely.
+_RULES = {
+    ast.UnaryOp: _rewrite_unary,
+    ast.BinOp: _rewrite_binop,
+}
+
+
 class AstSimplifier(ast.NodeTransformer):
     """
     Simplifies an AST using pattern matching.  This is for demonstration purposes only; the output will not be
@@ -20,24 +78,27 @@ class AstSimplifier(ast.NodeTransformer):
     in the `ast` module).
     """
 
+    # Identical subtrees (think `x + x + x`) are simplified over and over again; memoizing on a
+    # structural key lets every repetition reuse the first result.  The cache is capped so that
+    # huge trees with few repetitions cannot grow it without bound.
+    _CACHE_LIMIT = 1024
+
+    def __init__(self):
+        super().__init__()
+        self._cache = {}
+
     def generic_visit(self, node):
-        match super().generic_visit(node):
-            case ast.UnaryOp(ast.USub, ast.UnaryOp(ast.USub, e)):
-                return e
-            case ast.BinOp(e, ast.Add|ast.Sub, ast.Num(0)):
-                return e
-            case ast.BinOp(_, ast.Mult, e @ ast.Num(0)):
-                return e
-            case ast.BinOp(e, ast.Mult|ast.Div, ast.Num(1)):
-                return e
-            case ast.BinOp(ast.Num(a), ast.Add, ast.Num(b)):
-                return ast.Num(a + b)
-            case ast.BinOp(ast.Num(a), ast.Sub, ast.Num(b)):
-                return ast.Num(a - b)
-            case ast.BinOp(ast.Name(x), ast.Sub, ast.Name(y)) if x == y:
-                return ast.Num(0)
-            case x:
-                return x
+        key = ast.dump(node, annotate_fields=False)
+        result = self._cache.get(key)
+        if result is not None:
+            return result
+        result = super().generic_visit(node)
+        rewriter = _RULES.get(type(result))
+        if rewriter is not None:
+            result = rewriter(result)
+        if len(self._cache) < self._CACHE_LIMIT:
+            self._cache[key] = result
+        return result
 
 
 def simplify(tree):
@@ -61,15 +122,12 @@ def juxtapose(left, right):
         right = right[:]
     left = [line.expandtabs() for line in left]
     right = [line.expandtabs() for line in right]
-    m = max([len(line) for line in left]) + 2
-    for i, line in enumerate(left):
-        left[i] = line + ' ' * (m - len(line)) + '| '
-    empty = ' ' * m + '| '
-    while len(left) < len(right):
-        left.append(empty)
-    while len(left) > len(right):
-        right.append('')
-    result = [l + r for l, r in zip(left, right)]
+    m = max(map(len, left)) + 2
+    sep = '| '
+    left = [line.ljust(m) + sep for line in left]
+    empty = ' ' * m + sep
+    result = [(l if l is not None else empty) + (r if r is not None else '')
+              for l, r in zip_longest(left, right)]
     return '\n'.join(result)
 
 
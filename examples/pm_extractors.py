@@ -12,12 +12,13 @@
 
 class EMail:
 
-    def __unapply__(self):
-        if type(self) is str and '@' in self:
-            parts = self.split('@')
-            if len(parts) == 2 and '.' in parts[1] and len(parts[0]) > 0:
-                return tuple(parts)
-
+    @staticmethod
+    def __unapply__(s):
+        if type(s) is not str:
+            return None
+        user, sep, domain = s.partition('@')
+        if sep and user and '@' not in domain and '.' in domain:
+            return (user, domain)
         return None
 
 
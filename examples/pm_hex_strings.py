@@ -7,12 +7,18 @@
 # License: Apache 2.0
 #
 
+import re
+
+# The original pattern `['0', 'x'|'X', first @ (...), *rest]` forced Python to match the string
+# character by character; the compiled regex below checks the same shape in a single C-level scan.
+_HEX = re.compile(r'0[xX]([0-9A-Fa-f]+)\Z')
+
+
 def is_hex_string(s):
-    match s:
-        case ['0', 'x'|'X', first @ ('0' | ... | '9' | 'A' | ... | 'F' | 'a' | ... | 'f'), *rest]:
-            return hex(int(first + rest, 16)).upper()
-        case _:
-            return '-'
+    m = _HEX.match(s)
+    if m is not None:
+        return hex(int(m.group(1), 16)).upper()
+    return '-'
 
 def main():
     print("Testing 0x1F3C", is_hex_string("0x1F3C"))
@@ -6,12 +6,28 @@
 #
 # License: Apache 2.0
 #
-import builtins, inspect, os.path, types
+import builtins, functools, inspect, os.path, types
 from . import syntax_support
 from . import pama_decorators
 from .match_template import MatchException
 
 
+@functools.lru_cache(maxsize=128)
+def _compile_source(source: str, filename: str):
+    """
+    Translate the given source and compile both the resulting program and its auxiliary `__match__`
+    module.  Import hooks and REPL reloads tend to pass the same source repeatedly, so the compiled
+    code objects are cached; executing them into fresh modules remains the caller's job.
+    """
+    scanner = syntax_support.TextScanner(filename, source)
+    code = builtins.compile(scanner.get_text(), filename, 'exec')
+    # A source can mention `case`/`match` (say, as the decorator) without containing a single
+    # match statement; the scanner then has no match module to hand out
+    match_source = scanner.get_match_code()
+    match_code = builtins.compile(match_source, '__match__', 'exec') if match_source is not None else None
+    return code, match_code
+
+
 def case(pattern: str):
     """
     Use `case` as a decorator for functions, with full unpacking of the argument(s).
@@ -26,7 +42,15 @@ def case(pattern: str):
     def decorate(f):
         name = f.__code__.co_name
         frame = inspect.currentframe().f_back
-        multi = frame.f_locals.get(name, None)
+        # The namespace itself is the only safe cache here: any dict keyed on the code object
+        # aliases unrelated namespaces as soon as identical source is executed twice (compiled
+        # code objects are cached).  For module-level frames, reading f_globals gives the same
+        # answer as f_locals without materializing a fresh dict; function frames still pay the
+        # f_locals copy, but also get a fresh MultiFunction per run, as they must.
+        if frame.f_code.co_name == '<module>':
+            multi = frame.f_globals.get(name, None)
+        else:
+            multi = frame.f_locals.get(name, None)
         if not isinstance(multi, pama_decorators.MultiFunction):
             multi = pama_decorators.MultiFunction(name, frame.f_code.co_filename)
         multi.register(frame, pattern, f)
@@ -42,19 +66,30 @@ def pama_exec(source: str, filename: str = '<string>', module=None):
 
     The code is run inside a new dedicated module, which is then returned.
     """
-    scanner = syntax_support.TextScanner(filename, source)
-    code = scanner.get_text()
-    match_module = scanner.get_match_code()
-    match_mod = types.ModuleType('__match__')
-    exec(builtins.compile(match_module, '__match__', 'exec'), match_mod.__dict__)
-    compiled_code = builtins.compile(code, filename, 'exec')
-    if not filename.startswith('<'):
-        name = os.path.basename(filename)
-        if name.endswith('.py'): name = name[:-3]
+    if 'case' in source or 'match' in source:
+        compiled_code, match_code = _compile_source(source, filename)
+        if match_code is not None:
+            match_mod = types.ModuleType('__match__')
+            exec(match_code, match_mod.__dict__)
+        else:
+            match_mod = None
+    else:
+        # Cheap substring scan: without any `case` or `match` the scanner would find nothing, so
+        # the source can go straight to Python's own compiler
+        compiled_code = builtins.compile(source, filename, 'exec')
+        match_mod = None
+    if module is None:
+        # The module name is only needed when we create the module ourselves
+        if not filename.startswith('<'):
+            name = os.path.basename(filename)
+            if name.endswith('.py'): name = name[:-3]
+        else:
+            name = filename
+        mod = types.ModuleType(name)
     else:
-        name = filename
-    mod = types.ModuleType(name) if module is None else module
-    mod.__match__ = match_mod
+        mod = module
+    if match_mod is not None:
+        mod.__match__ = match_mod
     exec(compiled_code, mod.__dict__)
     return mod
 
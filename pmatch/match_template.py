@@ -6,7 +6,8 @@
 #
 # License: Apache 2.0
 #
-import inspect
+import re, sys, weakref
+from operator import attrgetter
 
 
 class MatchException(Exception): pass
@@ -15,6 +16,56 @@ class MatchException(Exception): pass
 _NO_VALUE_ = object()
 
 
+# The strategy `unapply` uses for a class (primitive, `_fields`, annotations, `__init__`) never
+# changes, so it is resolved once per class and kept as a small extractor function.  Weak keys
+# make sure the cache does not keep user classes alive.
+_unapply_cache = weakref.WeakKeyDictionary()
+
+
+def _strict_extractor(names):
+    # `attrgetter` fetches all fields in a single C call; a missing field means the object does
+    # not count as an instance, hence the `None`
+    if len(names) == 0:
+        return lambda obj: ()
+    if len(names) == 1:
+        get = attrgetter(names[0])
+        def extract(obj):
+            try:
+                return (get(obj),)
+            except AttributeError:
+                return None
+    else:
+        get = attrgetter(*names)
+        def extract(obj):
+            try:
+                return get(obj)
+            except AttributeError:
+                return None
+    return extract
+
+
+def _make_extractor(cls):
+    if cls in (bool, bytearray, bytes, complex, dict, float, frozenset, int, list, set, str, tuple):
+        return lambda obj: (obj,)
+
+    fields = getattr(cls, '_fields', None)
+    if isinstance(fields, tuple):
+        return _strict_extractor(tuple(field for field in fields if not field.startswith('_')))
+
+    annotations = getattr(cls, '__annotations__', None)
+    if isinstance(annotations, dict) and len(annotations) > 0:
+        return _strict_extractor(tuple(annot for annot in annotations if not annot.startswith('_')))
+
+    method = getattr(cls, '__init__', None)
+    if hasattr(method, '__code__'):
+        code = method.__code__
+        names = tuple(arg for arg in code.co_varnames[1:code.co_argcount+code.co_kwonlyargcount]
+                      if not arg.startswith('_'))
+        return lambda obj: tuple(getattr(obj, arg, None) for arg in names)
+
+    return lambda obj: ()
+
+
 def unapply(obj, cls):
     """
     Checks if the given object `obj` is an instance of class `cls`, and then tries to extract values for the fields.
@@ -57,34 +108,15 @@ def unapply(obj, cls):
         # with further checks.  Say, you want to make sure you have dictionary with a key `foo`, you can
         # write: `dict({ 'foo': _ })`.  Note that `{ 'foo': _ }` will, in contrast, only check if the
         # given value has a key `'foo'`, but there is no check for its type at all.
-        if cls in (bool, bytearray, bytes, complex, dict, float, frozenset, int, list, set, str, tuple):
-            return (obj,)
-
-        fields = getattr(cls, '_fields', None)
-        if isinstance(fields, tuple):
-            try:
-                result = [getattr(obj, field) for field in fields if not field.startswith('_')]
-                return tuple(result)
-            except AttributeError:
-                return None
-
-        annotations = getattr(cls, '__annotations__', None)
-        if isinstance(annotations, dict) and len(annotations) > 0:
+        extractor = _unapply_cache.get(cls)
+        if extractor is None:
+            extractor = _make_extractor(cls)
             try:
-                result = [getattr(obj, annot) for annot in annotations if not annot.startswith('_')]
-                return tuple(result)
-            except AttributeError:
-                return None
-
-        method = getattr(cls, '__init__', None)
-        if hasattr(method, '__code__'):
-            code = method.__code__
-            result = [getattr(obj, arg, None)
-                      for arg in code.co_varnames[1:code.co_argcount+code.co_kwonlyargcount]
-                      if not arg.startswith('_')]
-            return tuple(result)
-
-        return ()
+                _unapply_cache[cls] = extractor
+            except TypeError:
+                # Classes without weak-reference support are simply resolved anew each time
+                pass
+        return extractor(obj)
 
     # `callable` deconstructs all callable objects
     elif cls is callable and cls(obj):
@@ -96,10 +128,16 @@ def unapply(obj, cls):
 class SkipMatchException(Exception): pass
 
 
+# Attribute names in compiled code are interned, so the guard assignments emitted for each case
+# hit the identity test below; the equality compare only remains as a safety net for dynamic
+# setattr calls
+_GUARD_KEY = sys.intern('guard')
+
+
 class MatchGuard(type):
 
     def __setattr__(self, key, value):
-        if key == 'guard':
+        if key is _GUARD_KEY or key == 'guard':
             if not value:
                 raise SkipMatchException()
         else:
@@ -108,36 +146,57 @@ class MatchGuard(type):
 
 class Match(metaclass=MatchGuard):
 
+    __slots__ = ('value', '_value_item')
+
     def __init__(self, value):
         if len(value) == 1:
             self.value = value[0]
         else:
             self.value = tuple(value)
+        self._value_item = None
 
     def __enter__(self):
-        return [self.value, False]
+        # The returned list becomes `__matchvalue__` and is mutated by the case managers; keeping
+        # our own reference saves `__exit__` the frame walk and the expensive `f_locals` read.
+        # The third element is the unapply cache shared by all cases of this match block.
+        self._value_item = [self.value, False, {}]
+        return self._value_item
 
     def __exit__(self, exc_type, exc_value, traceback):
         result = exc_type is SkipMatchException or exc_type is None
         if result:
-            try:
-                frame = inspect.currentframe().f_back
-                value, handled = frame.f_locals['__matchvalue__']
-            except:
-                value, handled = None, True
-            if not handled:
-                raise MatchException(f"no matching pattern found for {repr(value)}")
+            item = self._value_item
+            if not item[1]:
+                raise MatchException(f"no matching pattern found for {repr(item[0])}")
         return result
 
 
 class CaseManager(metaclass=MatchGuard):
 
+    # The generated case classes add `source` and `targets` in their own __init__, hence the
+    # two extra slots here.  (The subclasses themselves declare no __slots__, but assignments
+    # to these names still go through the faster slot descriptors.)
+    __slots__ = ('_value_item', '_handled', '_guard', '_value', '_unapply_cache', 'source', 'targets')
+
     def __init__(self, value_item):
         self._value_item = value_item
-        value, handled = value_item
-        self._handled = handled
+        self._handled = value_item[1]
         self._guard = False
-        self._value = value
+        self._value = value_item[0]
+        # Cases of one match block share the cache through the value item, so a later case never
+        # repeats a deconstruction an earlier case has already done on the same object (a plain
+        # `match_X` call gets a private cache instead)
+        self._unapply_cache = value_item[2] if len(value_item) > 2 else {}
+
+    def _uc(self, node, cls):
+        # Entries keep a reference to the deconstructed object itself; otherwise a recycled id
+        # could serve stale results for short-lived sub-values
+        key = (id(node), cls)
+        entry = self._unapply_cache.get(key)
+        if entry is None:
+            entry = (node, unapply(node, cls))
+            self._unapply_cache[key] = entry
+        return entry[1]
 
     def __exit__(self, exc_type, exc_value, traceback):
         if exc_type is SkipMatchException or exc_type is None:
@@ -9,17 +9,46 @@
 import ast
 
 
+# Classification bits, computed once when a node is constructed.  The pattern parser's
+# `is_wildcard`/`is_seq_wildcard`/`is_string_element` predicates test these flags instead of
+# recursing through `Binding.value` chains on every query.
+WILDCARD = 1
+SEQ_WILDCARD = 2
+STRING_ELEMENT = 4
+
+
+def element_flags(node):
+    flags = getattr(node, '_flags', None)
+    if flags is None:
+        # Constants are plain `ast.Constant` nodes and carry no flags; only string constants
+        # count as string elements, everything else is unclassified
+        if type(node) is ast.Constant and type(node.value) is str:
+            return STRING_ELEMENT
+        return 0
+    return flags
+
+
 class Alternatives(ast.expr):
 
+    _flags = 0
+
     def __init__(self, elts: list):
         super().__init__()
         self.elts = elts
+        flags = STRING_ELEMENT
+        for elt in elts:
+            flags &= element_flags(elt)
+            if flags == 0:
+                break
+        self._flags = flags
 
     _fields = ('elts',)
 
 
 class AttributeDeconstructor(ast.expr):
 
+    _flags = 0
+
     def __init__(self, name, args: dict):
         super().__init__()
         self.name = name    # type: str or tuple
@@ -30,10 +59,13 @@ class AttributeDeconstructor(ast.expr):
 
 class Binding(ast.expr):
 
+    _flags = 0
+
     def __init__(self, target: str, value: ast.expr):
         super().__init__()
         self.target = target
         self.value = value
+        self._flags = element_flags(value)
 
     _fields = ('target', 'value')
 
@@ -43,6 +75,8 @@ Constant = ast.Constant
 
 class Deconstructor(ast.expr):
 
+    _flags = 0
+
     def __init__(self, name: str, args: list):
         super().__init__()
         self.name = name
@@ -53,6 +87,8 @@ class Deconstructor(ast.expr):
 
 class RegularExpression(ast.expr):
 
+    _flags = STRING_ELEMENT
+
     def __init__(self, pattern: str):
         super().__init__()
         self.pattern = pattern
@@ -62,6 +98,8 @@ class RegularExpression(ast.expr):
 
 class RegularExprType(ast.expr):
 
+    _flags = STRING_ELEMENT
+
     def __init__(self, type_name: str):
         super().__init__()
         self.type_name = type_name
@@ -71,6 +109,8 @@ class RegularExprType(ast.expr):
 
 class SequencePattern(ast.expr):
 
+    _flags = 0
+
     def __init__(self, left: list, right: list, sub_seqs: list, targets: list, min_length: int, exact_length: int):
         super().__init__()
         self.left = left
@@ -85,6 +125,8 @@ class SequencePattern(ast.expr):
 
 class SequenceRepetition(ast.expr):
 
+    _flags = 0
+
     def __init__(self, value, rep_count):
         super().__init__()
         self.value = value
@@ -95,6 +137,8 @@ class SequenceRepetition(ast.expr):
 
 class StringDeconstructor(ast.expr):
 
+    _flags = 0
+
     def __init__(self, groups: list, fixed_start: bool, targets: list):
         super().__init__()
         self.groups = groups
@@ -106,8 +150,12 @@ class StringDeconstructor(ast.expr):
 
 class Wildcard(ast.expr):
 
+    _flags = WILDCARD | STRING_ELEMENT
+
     def __init__(self, is_seq: bool):
         super().__init__()
         self.is_seq = is_seq
+        if is_seq:
+            self._flags = WILDCARD | SEQ_WILDCARD | STRING_ELEMENT
 
     _fields = ('is_seq',)
@@ -7,10 +7,83 @@
 # License: Apache 2.0
 #
 import ast
+import functools
 from . import pama_ast
 from . import pattern_parser
 
 
+@functools.lru_cache(maxsize=128)
+def _get_parser(filename: str, source_text: str):
+    """
+    Return a `PatternParser` for the given source.  The parser keeps no state between `parse`
+    calls, so compilers working on the same source (one per match statement) can share one
+    instance instead of each constructing their own.
+    """
+    return pattern_parser.PatternParser(filename, source_text)
+
+
+def _collect_pattern_targets(node, result: set):
+    """
+    Collect the names of all variables the given (already parsed) pattern will bind.
+    """
+    # All pattern nodes are exact instances of their leaf classes, so the exact type check
+    # avoids the isinstance MRO walk on every node of the recursion
+    t = type(node)
+    if t is pama_ast.Binding:
+        result.add(node.target)
+        _collect_pattern_targets(node.value, result)
+    elif t is pama_ast.SequencePattern:
+        for name in node.targets:
+            if name is not None:
+                result.add(name)
+        for elt in node.left:
+            _collect_pattern_targets(elt, result)
+        for elt in node.right:
+            _collect_pattern_targets(elt, result)
+        for seq in node.sub_seqs:
+            for elt in seq:
+                _collect_pattern_targets(elt, result)
+    elif t is pama_ast.StringDeconstructor:
+        for name in node.targets:
+            if name is not None:
+                result.add(name)
+        for group in node.groups:
+            for elt in group:
+                _collect_pattern_targets(elt, result)
+    elif t is pama_ast.Alternatives:
+        for elt in node.elts:
+            _collect_pattern_targets(elt, result)
+    elif t is pama_ast.Deconstructor:
+        for arg in node.args:
+            _collect_pattern_targets(arg, result)
+    elif t is pama_ast.AttributeDeconstructor:
+        for value in node.args.values():
+            _collect_pattern_targets(value, result)
+    elif t is pama_ast.SequenceRepetition:
+        _collect_pattern_targets(node.value, result)
+    elif t is ast.Dict:
+        for value in node.values:
+            _collect_pattern_targets(value, result)
+
+
+# Identical (pattern, guard) pairs produce identical class bodies up to the class name, which
+# only occurs in the header line.  The cache stores the rendered body together with the targets
+# and sources the compilation produced, so repeat patterns skip the whole parse/visit/emit
+# pipeline; it is capped so that pathological inputs cannot grow it without bound.
+_CLASS_CACHE = {}
+_CLASS_CACHE_LIMIT = 1024
+
+
+def _guard_free_names(guard: str):
+    """
+    Return the set of names a guard expression refers to, or `None` if it cannot be determined.
+    """
+    try:
+        return { n.id for n in ast.walk(ast.parse(guard, mode='eval')) if type(n) is ast.Name }
+    except SyntaxError:
+        return None
+
+
 class Compiler(ast.NodeVisitor):
     """
 
@@ -23,49 +96,116 @@ class Compiler(ast.NodeVisitor):
         self.alternative_lock = 0
         self.sources = []
         self.targets = []
-        self._parser = pattern_parser.PatternParser(self.filename, self.source_text)
+        self._targets_set = set()
+        self._guard_names = None
+        self._guard_hoisted = False
+        self._scan_lock = 0
+        self._lines = None
+        self._use_name_cache = {}
+        self._const_tmpl_cache = {}
+        self._method_cache = {}
+        self._regex_cache = {}
+        self._parser = _get_parser(self.filename, self.source_text)
 
     def _syntax_error(self, msg: str, node: ast.AST):
         if hasattr(node, 'lineno') and hasattr(node, 'col_offset'):
-            line = self.source_text.split('\n')[node.lineno-1] if self.source_text is not None else None
+            # Split the source lazily and only once per compiler, rather than on every error raised
+            if self._lines is None and self.source_text is not None:
+                self._lines = self.source_text.split('\n')
+            line = self._lines[node.lineno-1] if self._lines is not None else None
             return SyntaxError(msg, (self.filename, node.lineno, node.col_offset, line))
         else:
             return SyntaxError(msg)
 
     def create_class(self, node, name: str, guard: str):
+        key = (node, guard) if type(node) is str else None
+        if key is not None:
+            cached = _CLASS_CACHE.get(key)
+            if cached is not None:
+                body, targets, sources = cached
+                self.methods = []
+                self.targets = list(targets)
+                self._targets_set = set(targets)
+                self.sources = list(sources)
+                return f"class {name}(CaseManager):\n\n" + body
         node = self._parser.parse(node)
         self.methods = []
         self.alternative_lock = 0
         self.sources = []
         self.targets = []
+        self._targets_set = set()
+        self._use_name_cache = {}
+        self._method_cache = {}
+        self._regex_cache = {}
+        self._guard_hoisted = False
+        self._scan_lock = 0
+        # If all the names a guard depends on are bound early on, the guard is evaluated as soon
+        # as the last of them is bound (see `visit_Binding`), so that failing guards cut the rest
+        # of the pattern short.  `_guard_names` holds the bound names the guard is waiting for.
+        if guard is not None:
+            names = _guard_free_names(guard)
+            if names is not None:
+                bound = set()
+                _collect_pattern_targets(node, bound)
+                names &= bound
+            self._guard_names = names if names else None
+        else:
+            self._guard_names = None
         cond = self.visit(node).format('node')
         self.targets.sort()
         result = [
-            f"class {name}(CaseManager):",
             self._create_init(),
             self._create_enter(),
             self._create_guard(guard),
-            self._create_test(cond, None if guard is None else 'self.test_guard()'),
+            self._create_test(cond, None if guard is None or self._guard_hoisted
+                              else 'self.test_guard()'),
         ]
         result += self.methods
-        return '\n\n'.join(result) + '\n'
+        body = '\n\n'.join(result) + '\n'
+        if key is not None and len(_CLASS_CACHE) < _CLASS_CACHE_LIMIT:
+            _CLASS_CACHE[key] = (body, tuple(self.targets), tuple(self.sources))
+        return f"class {name}(CaseManager):\n\n" + body
+
+    def create_function(self, node, name: str, guard: str):
+        """
+        Create the code of a case class, followed by a plain module-level function `match_<name>`,
+        which performs the entire match with a single call.  The function returns the tuple of
+        bound values on success (possibly empty), and `None` otherwise, so that callers with a hot
+        dispatch loop can bypass the context-manager protocol of the class entirely.
+        """
+        result = self.create_class(node, name, guard)
+        if len(self.targets) > 0:
+            values = ', '.join(["t['{}']".format(t) for t in self.targets]) + ','
+            func = f"def match_{name}(value, **source):\n" \
+                   f"\tcase = {name}([value, False], **source)\n" \
+                   f"\tif case.test(value):\n" \
+                   f"\t\tt = case.targets\n" \
+                   f"\t\treturn ({values})\n" \
+                   f"\treturn None"
+        else:
+            func = f"def match_{name}(value, **source):\n" \
+                   f"\tcase = {name}([value, False], **source)\n" \
+                   f"\treturn () if case.test(value) else None"
+        return result + '\n' + func
 
     def get_targets(self):
         return self.targets
 
     def _create_enter(self):
-        result = "\tdef __enter__(self):\n" \
-                 "\t\tif self._handled:\n" \
-                 "\t\t\tself._guard = False\n" \
-                 "\t\telse:\n" \
-                 "\t\t\tself._guard = self.test(self._value)\n" \
-                 "\t\tt = self.targets\n"
+        parts = [
+            "\tdef __enter__(self):",
+            "\t\tif self._handled:",
+            "\t\t\tself._guard = False",
+            "\t\telse:",
+            "\t\t\tself._guard = self.test(self._value)",
+            "\t\tt = self.targets",
+        ]
         if len(self.targets) > 0:
             targets = ', '.join(["t['{}']".format(name) for name in self.targets])
-            result += f"\t\treturn self._guard, {targets}"
+            parts.append(f"\t\treturn self._guard, {targets}")
         else:
-            result += "\t\treturn self._guard"
-        return result
+            parts.append("\t\treturn self._guard")
+        return '\n'.join(parts)
 
     def _create_guard(self, guard: str):
         if guard is None:
@@ -87,73 +227,124 @@ class Compiler(ast.NodeVisitor):
         return '\n'.join(code)
 
     def _create_init(self):
-        targets = ', '.join([" '{}': None".format(name) for name in self.targets])
-        result = "\tdef __init__(self, value, **source):\n" \
-                 "\t\tsuper().__init__(value)\n" \
-                 "\t\tself.source = source\n" \
-                 "\t\tself.targets = {" + targets + " }"
-        return result
+        # `dict.fromkeys` builds the dict in a single C call with known capacity, whereas a dict
+        # literal hashes and stores the keys one bytecode op at a time
+        if len(self.targets) > 0:
+            keys = ', '.join([repr(name) for name in self.targets])
+            targets = f"dict.fromkeys(({keys},))"
+        else:
+            targets = "{}"
+        return '\n'.join([
+            "\tdef __init__(self, value, **source):",
+            "\t\tsuper().__init__(value)",
+            "\t\tself.source = source",
+            "\t\tself.targets = " + targets,
+        ])
 
     def _create_test(self, cond: str, guard: str):
-        result = f"\tdef test(self, node):\n" \
-                 f"\t\tresult = {cond}\n"
+        # A single return skips the store/load of a result local; with a guard, the and-chain
+        # short-circuits exactly like the old conditional did
         if guard is not None and guard != '':
-            result += f"\t\tif result and not {guard}:\n" \
-                      "\t\t\treturn False\n"
-        result += "\t\treturn result"
-        return result
+            body = f"\t\treturn ({cond}) and {guard}"
+        else:
+            body = f"\t\treturn {cond}"
+        return "\tdef test(self, node):\n" + body
 
     def check_target(self, target: str, node: ast.AST):
         if self.alternative_lock > 0:
             raise self._syntax_error("name bindings are not allowed inside alternative branches", node)
-        if target in self.targets:
+        # The companion set makes the redefinition check O(1); the list keeps insertion order for
+        # the final sorted output
+        if target in self._targets_set:
             raise self._syntax_error(f"redefinition of name {target}", node)
+        self._targets_set.add(target)
         self.targets.append(target)
 
+    def use_regex(self, pattern: str):
+        # Compile each distinct regex once, as a class attribute, so that matching does not go
+        # through the re module's pattern cache on every test (the match module imports `re`)
+        attr = self._regex_cache.get(pattern)
+        if attr is None:
+            attr = f"_re_{len(self.methods)}"
+            self.methods.append(f"\t{attr} = re.compile({repr(pattern)})")
+            self._regex_cache[pattern] = attr
+        return f"self.{attr}"
+
     def make_method(self, code):
+        # Repeated substructure (think `Add(x, x)` or nested wildcards) produces byte-identical
+        # method bodies; share one method per distinct body instead of emitting it again
+        key = tuple(code)
+        result = self._method_cache.get(key)
+        if result is not None:
+            return result
         name = f"_test_{len(self.methods)}"
         method = f"\tdef {name}(self, node):\n" \
                  f"\t\t" + '\n\t\t'.join(code)
         self.methods.append(method)
-        return f"self.{name}({{}})"
+        result = f"self.{name}({{}})"
+        self._method_cache[key] = result
+        return result
 
     def use_name(self, name):
         if type(name) is str:
+            # The same class name tends to occur many times within one pattern; remember the
+            # rendered reference, which also skips the linear scan over `sources` on repeats
+            result = self._use_name_cache.get(name)
+            if result is not None:
+                return result
             if '.' in name:
                 idx = name.index('.')
                 base = self.use_name(name[:idx])
-                return base + name[idx:]
+                result = base + name[idx:]
             else:
                 if name not in self.sources:
                     self.sources.append(name)
-                return f"self.source['{name}']"
+                result = f"self.source['{name}']"
+            self._use_name_cache[name] = result
+            return result
         elif type(name) in (list, set, tuple):
             names = [self.use_name(n) for n in name]
             return '(' + ', '.join(names) + ')'
         else:
             raise SystemError(f"this is not a name: '{name}'")
 
+    def visit(self, node):
+        visitor = self._VISITORS.get(type(node))
+        if visitor is not None:
+            return visitor(self, node)
+        return self.generic_visit(node)
+
     def generic_visit(self, node):
         raise SystemError(f"unexpected node in pattern matching: '{ast.dump(node)}'")
 
     def visit_Alternatives(self, node: pama_ast.Alternatives):
-        if all(isinstance(elt, pama_ast.Constant) for elt in node.elts):
-            return f"{{}} in ({', '.join([repr(elt.value) for elt in node.elts])})"
+        if all(type(elt) is pama_ast.Constant for elt in node.elts):
+            values = ', '.join([repr(elt.value) for elt in node.elts])
+            # Beyond a handful of constants, a set display wins: the compiler folds it into a
+            # single frozenset constant, so membership becomes one hash lookup instead of a
+            # linear scan.  For tiny alternatives the tuple scan is still cheaper.  The hash
+            # check keeps unhashable subjects (lists, dicts) on the no-match path, where the
+            # tuple form simply compared unequal.
+            if len(node.elts) > 4:
+                return "(getattr({0}, '__hash__', None) is not None and {0} in {{" + values + '}})'
+            return '{} in (' + values + ')'
 
         # if possible, we start with a check if the given value has the necessary type
         code = []
-        if all(isinstance(elt, (pama_ast.AttributeDeconstructor, pama_ast.Deconstructor)) for elt in node.elts):
-            names = set()
+        if all(type(elt) in (pama_ast.AttributeDeconstructor, pama_ast.Deconstructor) for elt in node.elts):
+            # A dict keyed by name dedupes like a set but keeps insertion order, so the emitted
+            # isinstance tuple is deterministic for otherwise identical patterns
+            names = {}
             for elt in node.elts:
                 if type(elt.name) is str:
-                    names.add(elt.name)
+                    names[elt.name] = None
                 else:
                     for n in elt.name:
-                        names.add(n)
+                        names[n] = None
 
             if '_' not in names:
-                test = f"isinstance({{}}, {self.use_name(names)})"
-                if all(isinstance(elt, pama_ast.Deconstructor) and len(elt.args) == 0 for elt in node.elts):
+                test = f"isinstance({{}}, {self.use_name(list(names))})"
+                if all(type(elt) is pama_ast.Deconstructor and len(elt.args) == 0 for elt in node.elts):
                     return test
                 code.append(f"if not {test.format('node')}: return False")
 
@@ -168,30 +359,50 @@ class Compiler(ast.NodeVisitor):
         code = [
             f"if not isinstance(node, {self.use_name(node.name)}): return False",
         ]
+        # A single getattr with the sentinel replaces the hasattr/getattr double lookup; it also
+        # fixes the emitted condition, which used to reference the bare attribute name
         for key in node.args:
-            cond = self.visit(node.args[key]).format(key)
-            code.append(f"if not hasattr(node, '{key}') or not {cond}: return False")
+            cond = self.visit(node.args[key]).format('v')
+            code.append(f"v = getattr(node, '{key}', _NO_VALUE_)")
+            code.append(f"if v is _NO_VALUE_ or not {cond}: return False")
         code.append("return True")
         return self.make_method(code)
 
     def visit_Binding(self, node: pama_ast.Binding):
         self.check_target(node.target, node)
         cond = self.visit(node.value)
+        # Once the last name the guard depends on is bound, evaluate the guard right here instead
+        # of at the very end of the match.  Bindings anywhere inside a sequence pattern are
+        # excluded: sub-sequence tests run repeatedly while searching for the matching position,
+        # and the sequence method's except clause would swallow exceptions a guard raises.
+        if self._guard_names is not None and not self._guard_hoisted and self._scan_lock == 0 and \
+                self._guard_names.issubset(self.targets):
+            self._guard_hoisted = True
+            test = f"return {cond.format('node')} and self.test_guard()"
+        else:
+            test = f"return {cond.format('node')}"
         code = [
             f"self.targets['{node.target}'] = node",
-            f"return {cond.format('node')}"
+            test
         ]
         return self.make_method(code)
 
     def visit_Constant(self, node: pama_ast.Constant):
-        return f"{{}} == {repr(node.value)}"
+        # The emitted test only depends on the constant's value, and the same literals recur a
+        # lot across patterns, so the repr work is done once per value and kept across classes
+        key = (type(node.value), node.value)
+        result = self._const_tmpl_cache.get(key)
+        if result is None:
+            result = f"{{}} == {repr(node.value)}"
+            self._const_tmpl_cache[key] = result
+        return result
 
     def visit_Deconstructor(self, node: pama_ast.Deconstructor):
         if len(node.args) == 0:
-            return f"(unapply({{}}, {self.use_name(node.name)}) is not None)"
+            return f"(self._uc({{}}, {self.use_name(node.name)}) is not None)"
 
         code = [
-            f"u = unapply(node, {self.use_name(node.name)})",
+            f"u = self._uc(node, {self.use_name(node.name)})",
             "if u is None: return False",
             f"if len(u) < {len(node.args)}:",
             f"\traise TypeError(\"unpacking of '{node.name}'-value did not provide enough arguments\")",
@@ -201,30 +412,37 @@ class Compiler(ast.NodeVisitor):
             test = self.visit(arg).format("u[0]")
             code.append(f"return {test}")
         else:
-            for i, arg in enumerate(node.args):
-                test = self.visit(arg).format(f"u[{i}]")
-                if test != "True":
+            tests = [self.visit(arg).format(f"u[{i}]") for i, arg in enumerate(node.args)]
+            tests = [test for test in tests if test != "True"]
+            if len(tests) == 0:
+                code.append("return True")
+            elif len(tests) <= 4:
+                # A short and-chain has the same short-circuit order as the if-cascade but
+                # runs as one expression instead of a jump-and-return per argument
+                code.append("return " + " and ".join(tests))
+            else:
+                for test in tests:
                     code.append(f"if not {test}: return False")
-            code.append("return True")
+                code.append("return True")
         return self.make_method(code)
 
     def visit_Dict(self, node: ast.Dict):
         code = []
         for key, value in zip(node.keys, node.values):
             cond = self.visit(value)
-            code.append(f"v = node.get({repr(key.value)}, _NO_VALUE_)")
-            code.append(f"if v is _NO_VALUE_ or not {cond.format('v')}: return False")
+            key = repr(key.value)
+            # A membership test plus direct subscript beats fetching a sentinel default and
+            # comparing identities: both lookups are single C calls with no global load
+            code.append(f"if {key} not in node: return False")
+            code.append(f"if not {cond.format(f'node[{key}]')}: return False")
         code.append("return True")
         return self.make_method(code)
 
     def visit_RegularExpression(self, node: pama_ast.RegularExpression):
-        code = [
-            "import re",
-            "if not isinstance(node, str): return False",
-            f"m = re.fullmatch({repr(node.pattern)}, node)",
-            "return m is not None"
-        ]
-        return self.make_method(code)
+        # The whole test is a single expression, so it is inlined into the caller instead of
+        # going through a `_test_i` method call.  The numbered field lets one `format` call
+        # fill both occurrences of the value.
+        return f"(isinstance({{0}}, str) and {self.use_regex(node.pattern)}.fullmatch({{0}}) is not None)"
 
     def visit_RegularExprType(self, node: pama_ast.RegularExprType):
         if node.type_name in ('float', 'int'):
@@ -252,12 +470,20 @@ class Compiler(ast.NodeVisitor):
         return self.make_method(code)
 
     def visit_SequencePattern(self, node: pama_ast.SequencePattern):
+        # Everything emitted here runs inside the try/except below, which would also swallow an
+        # exception raised by a hoisted guard; holding the lock for the whole method keeps
+        # `visit_Binding` from hoisting the guard into any sequence element
+        self._scan_lock += 1
         code = [ "try:" ]
 
+        # The emitted code calls len(node) at most once; the length feeds both the up-front
+        # check and the scan bound below
+        if node.exact_length is not None or node.min_length is not None or len(node.sub_seqs) > 0:
+            code.append("\tn = len(node)")
         if node.exact_length is not None:
-            code.append(f"\tif len(node) != {node.exact_length}: return False")
+            code.append(f"\tif n != {node.exact_length}: return False")
         elif node.min_length is not None:
-            code.append(f"\tif len(node) < {node.min_length}: return False")
+            code.append(f"\tif n < {node.min_length}: return False")
 
         for i, elt in enumerate(node.left):
             cond = self.visit(elt).format(f"node[{i}]")
@@ -268,17 +494,44 @@ class Compiler(ast.NodeVisitor):
 
         if len(node.sub_seqs) > 0:
             code.append(f"\ti = {len(node.left)}")
-            code.append(f"\tmax_i = len(node) - {len(node.right)}")
+            code.append(f"\tmax_i = n - {len(node.right)}")
             for j, seq in enumerate(node.sub_seqs):
-                cond = ' and '.join([self.visit(elt).format("node[i+{}]".format(i)) for i, elt in enumerate(seq)])
                 code.append("\ti0 = i")
-                code.append("\thas_match = False")
-                code.append("\twhile i < max_i:")
-                code.append(f"\t\tif {cond}:")
-                code.append("\t\t\thas_match = True")
-                code.append("\t\t\tbreak")
-                code.append("\t\ti += 1")
-                code.append("\tif not has_match: return False")
+                cond = ' and '.join([self.visit(elt).format("node[i+{}]".format(i)) for i, elt in enumerate(seq)])
+                if all(type(elt) is pama_ast.Constant and type(elt.value) is not bytes and
+                       (type(elt.value) is not str or len(elt.value) == 1) for elt in seq):
+                    # A constant sub-sequence can be located with the C-level `index` method
+                    # instead of a Python loop; a failed search raises ValueError, which the
+                    # surrounding except turns into the usual `return False`.  Only list, tuple
+                    # and str subjects take this path: other sequences (range, memoryview, ...)
+                    # lack a start/stop-capable index() and fall back to the scan loop below.
+                    # Longer string constants are excluded, as `str.index` would find them as
+                    # substrings where an element comparison never can; bytes constants are
+                    # excluded entirely, since the elements of a bytes value are ints, so an
+                    # element comparison with a bytes constant never matches while `bytes.index`
+                    # happily finds it as a subsequence.
+                    first = repr(seq[0].value)
+                    code.append("\tif isinstance(node, (list, tuple, str)):")
+                    if len(seq) == 1:
+                        code.append(f"\t\ti = node.index({first}, i, max_i)")
+                    else:
+                        rest = ' and '.join([f"node[i+{k}] == {repr(elt.value)}"
+                                             for k, elt in enumerate(seq[1:], 1)])
+                        code.append("\t\twhile True:")
+                        code.append(f"\t\t\ti = node.index({first}, i, max_i)")
+                        code.append(f"\t\t\tif {rest}: break")
+                        code.append("\t\t\ti += 1")
+                    code.append("\telse:")
+                    indent = "\t\t"
+                else:
+                    indent = "\t"
+                code.append(indent + "has_match = False")
+                code.append(indent + "while i < max_i:")
+                code.append(indent + f"\tif {cond}:")
+                code.append(indent + "\t\thas_match = True")
+                code.append(indent + "\t\tbreak")
+                code.append(indent + "\ti += 1")
+                code.append(indent + "if not has_match: return False")
                 name = node.targets[j] if j < len(node.targets) else None
                 if name is not None:
                     self.check_target(name, node)
@@ -297,8 +550,13 @@ class Compiler(ast.NodeVisitor):
             code.append(f"\tself.targets['{node.targets[0]}'] = node[{a}:{b}]")
 
         code.append("\treturn True")
-        code.append("except:")
+        # The narrow tuple covers everything a non-sequence or a failed scan can raise (TypeError
+        # from len/index, IndexError/KeyError from subscripts, ValueError from index(), and
+        # AttributeError from nested element tests); a bare except would also swallow real bugs
+        # and allocate a traceback for unrelated errors
+        code.append("except (AttributeError, IndexError, KeyError, TypeError, ValueError):")
         code.append("\treturn False")
+        self._scan_lock -= 1
         return self.make_method(code)
 
     def visit_SequenceRepetition(self, node: pama_ast.SequenceRepetition):
@@ -308,13 +566,14 @@ class Compiler(ast.NodeVisitor):
         # Special case `'abc' + _` testing if a string has a particular prefix
         if len(node.groups) == 2 and len(node.groups[0]) == 1 and len(node.groups[1]) == 0 and len(node.targets) == 0:
             item = node.groups[0][0]
-            if isinstance(item, pama_ast.Constant):
-                code = [
-                    f"return isinstance(node, str) and node.startswith({repr(item.value)})",
-                ]
-                return self.make_method(code)
+            if type(item) is pama_ast.Constant:
+                # A single expression; inline it rather than paying a method call per test
+                return f"(isinstance({{0}}, str) and {{0}}.startswith({repr(item.value)}))"
 
         code = [
+            # Rejecting non-strings up front is cheaper than an exception and also keeps the
+            # length comparison below from blowing up on objects without len()
+            "if not isinstance(node, str): return False",
             f"result = {self.visit_str_StringDeconstructor(node).format('node')}",
             "return result == len(node)",
         ]
@@ -378,10 +637,9 @@ class Compiler(ast.NodeVisitor):
 
     def visit_str_Binding(self, node: pama_ast.Binding):
         self.check_target(node.target, node)
-        if isinstance(node.value, pama_ast.RegularExpression):
+        if type(node.value) is pama_ast.RegularExpression:
             code = [
-                "import re",
-                f"m = re.search({repr(node.value.pattern)}, node)",
+                f"m = {self.use_regex(node.value.pattern)}.search(node)",
                 "if m is not None:",
                 "\ti, j = m.start(), m.end()",
                 f"\tself.targets['{node.target}'] = node[i:j]",
@@ -411,8 +669,7 @@ class Compiler(ast.NodeVisitor):
 
     def visit_str_RegularExpression(self, node: pama_ast.RegularExpression):
         code = [
-            "import re",
-            f"m = re.search({repr(node.pattern)}, node)",
+            f"m = {self.use_regex(node.pattern)}.search(node)",
             "return None if m is None else (m.start(), m.end())",
         ]
         return self.make_method(code)
@@ -491,3 +748,20 @@ class Compiler(ast.NodeVisitor):
         if node.is_seq:
             raise self._syntax_error("unexpected sequence wildcard", node)
         return "(0, 1) if len({}) > 0 else None"
+
+    # As in the pattern parser, dispatching `visit` through this table replaces `NodeVisitor`'s
+    # per-node string concatenation and `getattr` with a single dict lookup.
+    _VISITORS = {
+        ast.Dict: visit_Dict,
+        pama_ast.Alternatives: visit_Alternatives,
+        pama_ast.AttributeDeconstructor: visit_AttributeDeconstructor,
+        pama_ast.Binding: visit_Binding,
+        pama_ast.Constant: visit_Constant,
+        pama_ast.Deconstructor: visit_Deconstructor,
+        pama_ast.RegularExpression: visit_RegularExpression,
+        pama_ast.RegularExprType: visit_RegularExprType,
+        pama_ast.SequencePattern: visit_SequencePattern,
+        pama_ast.SequenceRepetition: visit_SequenceRepetition,
+        pama_ast.StringDeconstructor: visit_StringDeconstructor,
+        pama_ast.Wildcard: visit_Wildcard,
+    }
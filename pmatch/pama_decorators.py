@@ -11,18 +11,45 @@ import os.path
 from . import pama_compiler
 
 
-def _resolve_name(frame, name: str):
-    while frame is not None:
-        if name in frame.f_locals:
-            return frame.f_locals[name]
-        if frame.f_back is not None:
-            frame = frame.f_back
-        elif name in frame.f_globals:
-            return frame.f_globals[name]
-    if name in builtins.__dict__:
-        return builtins.__dict__[name]
-    else:
+# The match template is the same for every MultiFunction; read and compile it exactly once, so
+# that creating a MultiFunction only has to exec the cached code object.
+_TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), 'match_template.py')
+with open(_TEMPLATE_PATH) as _f:
+    _TEMPLATE_CODE = builtins.compile(_f.read(), _TEMPLATE_PATH, 'exec')
+del _f
+
+
+def _get_top_class_name(node):
+    """
+    If the outermost pattern is a class pattern such as `Foo(...)` or `Foo(x=...)`, return the
+    (possibly dotted) name of the class, and `None` otherwise.
+    """
+    if isinstance(node, ast.Module) and len(node.body) == 1:
+        node = node.body[0]
+    if isinstance(node, ast.Expr):
+        node = node.value
+    if not isinstance(node, ast.Call):
         return None
+    node = node.func
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return '.'.join(reversed(parts))
+    return None
+
+
+def _resolve_name(frame, name: str):
+    # Names used by a pattern are found in the decorated function's own scope, its module, or the
+    # builtins; walking the entire frame chain materializes f_locals for every level and is not
+    # needed in practice.
+    if name in frame.f_locals:
+        return frame.f_locals[name]
+    if name in frame.f_globals:
+        return frame.f_globals[name]
+    return builtins.__dict__.get(name, None)
 
 
 # TODO: Complete the implementation
@@ -37,12 +64,12 @@ class MultiFunction(object):
         self.name = name
         self.functions = []
         self.compiler = pama_compiler.Compiler(filename, None)
-        self._module = None
+        self._module = types.ModuleType('__match__')
         self._name_index = 0
-        self._mod_code = []
-        name = os.path.join(os.path.dirname(__file__), 'match_template.py')
-        with open(name) as f:
-            self._mod_code.append(''.join(list(f.readlines())))
+        self._pattern_cache = {}
+        self._case_classes = []
+        self._dispatch_cache = {}
+        exec(_TEMPLATE_CODE, self._module.__dict__)
 
     def __call__(self, *args, **kwargs):
         if len(args) == 1:
@@ -53,42 +80,72 @@ class MultiFunction(object):
 
     def dispatch(self, arg, kwargs):
         if self.validate():
-            mod = self._module.__dict__
-            for (name, sources, targets, _, function) in self.functions:
-                P = mod[name]
-                p = P([arg, False], **sources)
-                q = p.__enter__()
-                if type(q) is bool:
-                    guard, f_vars = q, []
-                else:
-                    guard, *f_vars = q
-                if guard:
-                    kwargs.update({ key: value for key, value in zip(targets, f_vars) })
+            arg_type = type(arg)
+            cases = self._dispatch_cache.get(arg_type, None)
+            if cases is None:
+                cases = self._select_cases(arg_type)
+                self._dispatch_cache[arg_type] = cases
+            for (matcher, sources, targets, _, function) in cases:
+                f_vars = matcher(arg, **sources)
+                if f_vars is not None:
+                    if targets:
+                        kwargs.update(zip(targets, f_vars))
                     return function(**kwargs)
 
             return None
         else:
             raise SystemError("could not compile patterns")
 
-    def invalidate(self):
-        self._module = None
-
     def register(self, frame, pattern: str, function):
-        self._name_index += 1
-        name = f"Case{self._name_index}"
-        ast_node = ast.parse(pattern)
-        code = self.compiler.create_class(ast_node, name, None)
-        self._mod_code.append(code)
-        targets = self.compiler.targets
-        sources = self.compiler.sources
-        sources = { s: _resolve_name(frame, s) for s in sources }
-        self.functions.append((name, sources, targets, pattern, function))
-        self.invalidate()
-
-    def validate(self):
-        if self._module is None:
-            code = '\n\n'.join(self._mod_code)
-            self._module = types.ModuleType('__match__')
+        # We compile each new case incrementally into the existing module, so that neither the match
+        # template, nor any of the previously registered cases need to be recompiled.  Patterns that
+        # have already been compiled once are simply looked up, and reuse the existing class.
+        cached = self._pattern_cache.get(pattern, None)
+        if cached is None:
+            self._name_index += 1
+            name = f"Case{self._name_index}"
+            ast_node = ast.parse(pattern)
+            code = self.compiler.create_function(ast_node, name, None)
             exec(builtins.compile(code, '__match__', 'exec'), self._module.__dict__)
+            matcher = self._module.__dict__[f"match_{name}"]
+            targets = self.compiler.targets
+            src_names = self.compiler.sources
+            top_class = _get_top_class_name(ast_node)
+            self._pattern_cache[pattern] = (matcher, src_names, targets, top_class)
+        else:
+            matcher, src_names, targets, top_class = cached
+        sources = { s: _resolve_name(frame, s) for s in src_names }
+        self.functions.append((matcher, sources, targets, pattern, function))
+        self._case_classes.append(self._resolve_class(top_class, sources))
+        self._dispatch_cache.clear()
+
+    def _resolve_class(self, name, sources):
+        """
+        Try and resolve the class a top-level class pattern refers to, so that `dispatch` can skip
+        the case for arguments that cannot possibly match.  Returns `None` if the case should be
+        tried for every argument.
+        """
+        if name is None:
+            return None
+        if '.' in name:
+            parts = name.split('.')
+            cls = sources.get(parts[0], None)
+            for part in parts[1:]:
+                cls = getattr(cls, part, None)
+        else:
+            cls = sources.get(name, None)
+        if isinstance(cls, type) and getattr(cls, '__unapply__', None) is None:
+            return cls
+        return None
 
+    def _select_cases(self, arg_type):
+        """
+        Build the list of cases that could possibly match a value of type `arg_type`, keeping the
+        original registration order.  Only cases whose top-level class pattern provably excludes the
+        type are dropped; everything else remains a candidate.
+        """
+        return [case for case, cls in zip(self.functions, self._case_classes)
+                if cls is None or issubclass(arg_type, cls)]
+
+    def validate(self):
         return self._module is not None
@@ -12,12 +12,21 @@ modules).  Once the `PathFinder` has located a module, we check if the module is
 directory) as the module that called the `enabled_auto_import`.  In other words: PyMa does not interfere with modules
 from other packages in your system.
 """
+from functools import lru_cache
 from importlib.abc import Loader, MetaPathFinder
 from importlib.machinery import ModuleSpec
 from os.path import normpath
+import os
+import re
 import sys
 
 
+# Matches a line starting (up to indentation) with the keyword `case`, followed by something that
+# could be a pattern.  Lines where `case` is used as a regular name, such as `case = 5`, `case.f()`,
+# or `case += 1`, are rejected by the look-ahead groups.
+_CASE_RE = re.compile(rb'(?m)^[ \t]*case(?![A-Za-z_])[ \t]*(?=[^=,;.\s])(?![^A-Za-z0-9_\s]=)')
+
+
 def _get_original_path_finder():
     """
     Try and return Python's `PathFinder`, which is responsible for importing non-builtin modules.  If it can't be
@@ -25,13 +34,7 @@ def _get_original_path_finder():
 
     Our own import hook uses the original `PathFinder` under the hood, and delegates whatever it can to it.
     """
-    for item in sys.meta_path:
-        try:
-            if item.__name__ == 'PathFinder':
-                return item
-        except:
-            pass
-    return None
+    return next((item for item in sys.meta_path if getattr(item, '__name__', None) == 'PathFinder'), None)
 
 
 def _has_case_statement(path):
@@ -45,21 +48,24 @@ def _has_case_statement(path):
     our import hook.
     """
     try:
-        with open(path) as f:
-            for line in f.readlines():
-                stripped_line = line.lstrip()
-                if stripped_line.startswith('case') and len(stripped_line) > 4 and not stripped_line[4].isidentifier():
-                    s = stripped_line[4:].lstrip()
-                    if len(s) == 0 or s[0] in ('=', ',', ';', '.'):
-                        continue
-                    if len(s) > 1 and s[1] == '=' and not s[0].isalnum():
-                        continue
-                    return True
+        st = os.stat(path)
+        return _scan_cached(path, st.st_mtime_ns, st.st_size)
     except:
         pass
     return False
 
 
+@lru_cache(maxsize=4096)
+def _scan_cached(path, mtime_ns, size):
+    """
+    The actual file scan behind `_has_case_statement`.  The `mtime_ns` and `size` arguments are only
+    part of the cache key: as long as the file on disk is unchanged, repeated checks for the same
+    path are answered without reading the file again.
+    """
+    with open(path, 'rb') as f:
+        return _CASE_RE.search(f.read()) is not None
+
+
 class PyMa_Loader(Loader):
 
     def __init__(self, filename):
@@ -71,40 +77,62 @@ class PyMa_Loader(Loader):
 
     def exec_module(self, module):
         from . import pama_exec
-        with open(module.__name__) as input_file:
-            input_text = ''.join(input_file.readlines())
-            pama_exec(input_text, filename=self._filename, module=module)
+        # Read the raw bytes in one go and decode ourselves; this also stops relying on
+        # `module.__name__` happening to hold the path (the loader knows the actual file)
+        with open(self._filename, 'rb') as input_file:
+            input_text = input_file.read().decode('utf-8')
+        pama_exec(input_text, filename=self._filename, module=module)
 
 
 class PyMa_Finder(MetaPathFinder):
 
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, path_finder=None):
         super().__init__()
         self._base_path = normpath(base_path)
-        self._path_finder = _get_original_path_finder()
+        self._path_finder = path_finder if path_finder is not None else _get_original_path_finder()
+        # Almost every import in a process concerns modules outside `base_path`.  Remembering the
+        # names we have already rejected answers those imports with a single set lookup instead
+        # of delegating to the `PathFinder` again.  Exact-name misses and whole-subtree misses
+        # are kept apart: a case-free `__init__.py` under `base_path` only rules out that one
+        # name, whereas a top-level package outside `base_path` rules out all its submodules.
+        # Positive results keep the resolved origin, so repeated lookups skip the delegation too.
+        self._miss_cache = set()
+        self._subtree_miss_cache = set()
+        self._hit_cache = {}
 
     def find_spec(self, fullname, path, target = None):
+        if fullname in self._miss_cache or fullname.split('.', 1)[0] in self._subtree_miss_cache:
+            return None
+        key = (fullname, tuple(path) if path else None)
+        origin = self._hit_cache.get(key)
+        if origin is not None:
+            return ModuleSpec(origin, PyMa_Loader(origin))
         if self._path_finder:
             result = self._path_finder.find_spec(fullname, path, target)
             try:
                 name = normpath(result.origin)
-                if name.startswith(self._base_path) and _has_case_statement(name):
-                    return ModuleSpec(result.origin, PyMa_Loader(result.origin))
+                if name.startswith(self._base_path):
+                    if _has_case_statement(name):
+                        self._hit_cache[key] = result.origin
+                        return ModuleSpec(result.origin, PyMa_Loader(result.origin))
+                else:
+                    # The whole top-level package lives elsewhere; none of its submodules can
+                    # ever be ours
+                    self._subtree_miss_cache.add(fullname.split('.', 1)[0])
             except:
                 pass
-
+        self._miss_cache.add(fullname)
         return None
 
 
 def install_hook(base_path: str):
-    finder = PyMa_Finder(base_path)
-    for i, item in enumerate(sys.meta_path):
-        try:
-            if item.__name__ == 'PathFinder':
-                sys.meta_path.insert(i, finder)
-                return
-        except:
-            pass
+    # Resolve the `PathFinder` a single time here and hand it to the finder, so that `find_spec`
+    # never has to re-scan `sys.meta_path` on the import hot path
+    path_finder = _get_original_path_finder()
+    finder = PyMa_Finder(base_path, path_finder)
+    if path_finder is not None:
+        sys.meta_path.insert(sys.meta_path.index(path_finder), finder)
+        return
 
     if len(sys.meta_path) > 2:
         sys.meta_path.insert(2, finder)
@@ -7,32 +7,92 @@
 # License: Apache 2.0
 #
 import ast
+from functools import lru_cache
 from . import pama_ast
 
 
+# Aliases for the names the visitors touch on every call; one local/global load instead of a
+# module attribute lookup per constructed node.
 _cl = ast.copy_location
+_Binding = pama_ast.Binding
+_Constant = pama_ast.Constant
+_Deconstructor = pama_ast.Deconstructor
 
 
-def _flatten_op(node, op):
-    if isinstance(node, ast.BinOp) and isinstance(node.op, op):
-        left = _flatten_op(node.left, op)
-        right = _flatten_op(node.right, op)
-        return left + right
+@lru_cache(maxsize=1024)
+def _parse_pattern(source: str):
+    """
+    Parse a pattern given as string.  The same small patterns tend to recur across the cases of a
+    module, so the raw `ast.parse` result is cached; the transformer does not mutate the parsed
+    tree, it builds its own nodes, so the cached tree can safely be visited more than once.
+    """
+    return ast.parse(source)
+
+
+# The names `visit_Set` accepts inside `{...}` patterns; kept at module level so that each visit
+# only pays for a hash lookup instead of rebuilding the containers.
+_REGEX_TYPE_NAMES = frozenset({
+    'bool', 'float', 'int',
+    'alnum', 'alpha', 'ascii', 'decimal', 'digit', 'identifier', 'lower',
+    'numeric', 'printable', 'space', 'title', 'upper',
+})
+
+_REGEX_NAMED_PATTERNS = {
+    'name':  r'[A-Za-z_]\w+',
+    'whitespace': r'\s+',
+}
+
+
+# The literal value types accepted as dict-pattern keys; testing the `Constant` value type
+# directly replaces an isinstance ladder over the deprecated `Str`/`Num`/`NameConstant` wrappers,
+# each of which re-derives its answer from the value type anyway.
+_DICT_KEY_TYPES = frozenset({str, int, float, complex, bool, type(None)})
+_NUM_TYPES = frozenset({int, float, complex})
 
-    else:
-        return [node]
+
+# Wildcards carry no state beyond `is_seq` and are never mutated once built, so the parser shares
+# two pre-built instances instead of allocating a fresh node per identifier; only the `Binding`
+# wrapper is created per name.
+_WILDCARD_ELT = pama_ast.Wildcard(is_seq=False)
+_WILDCARD_SEQ = pama_ast.Wildcard(is_seq=True)
+_WILDCARD_ELT.lineno = _WILDCARD_SEQ.lineno = 1
+_WILDCARD_ELT.col_offset = _WILDCARD_SEQ.col_offset = 0
+
+
+def _flatten_op(node, op):
+    # An explicit stack avoids both the recursion and the intermediate list copies of the former
+    # `left + right` version; long `|`- and `+`-chains are flattened into a single list in one pass.
+    result = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if type(node) is ast.BinOp and type(node.op) is op:
+            stack.append(node.right)
+            stack.append(node.left)
+        else:
+            result.append(node)
+    return result
 
 
 def _get_name(node):
-    if isinstance(node, ast.Name):
+    # Patterns only ever contain exact `ast` node instances, so the pointer comparison via
+    # `type(...) is` replaces the `isinstance` MRO walk on these hot paths.
+    if type(node) is ast.Name:
         return node.id
 
-    elif isinstance(node, ast.Attribute):
-        base = _get_name(node.value)
-        if base is not None:
-            return base + '.' + node.attr
-
-    elif isinstance(node, ast.Tuple):
+    elif type(node) is ast.Attribute:
+        # Walk the attribute chain iteratively and join once, rather than concatenating a new
+        # string at every level of the recursion.
+        parts = [node.attr]
+        node = node.value
+        while type(node) is ast.Attribute:
+            parts.append(node.attr)
+            node = node.value
+        if type(node) is ast.Name:
+            parts.append(node.id)
+            return '.'.join(reversed(parts))
+
+    elif type(node) is ast.Tuple:
         names = [_get_name(elt) for elt in node.elts]
         if all(type(item) is str for item in names):
             if any(item == '_' for item in names):
@@ -44,56 +104,36 @@ def _get_name(node):
 
 
 def _is_int(node):
-    return isinstance(node, ast.Num) and type(node.n) is int
+    # `ast.parse` only ever produces `ast.Constant` literals, so the exact type check sidesteps
+    # the `__instancecheck__` machinery of the deprecated `ast.Num`/`ast.Str` wrappers.
+    return type(node) is ast.Constant and type(node.value) is int
 
 
 def _is_same_const_type(nodeA, nodeB):
-    if type(nodeA) is type(nodeB):
-        if isinstance(nodeA, ast.Num):
-            return type(nodeA.n) is type(nodeB.n) is int
-
-        elif isinstance(nodeA, ast.Str):
-            return len(nodeA.s) == len(nodeB.s) == 1
+    if type(nodeA) is ast.Constant and type(nodeB) is ast.Constant:
+        a, b = nodeA.value, nodeB.value
+        if type(a) is type(b) is int:
+            return True
+        if type(a) is type(b) is str:
+            return len(a) == len(b) == 1
 
     return False
 
 
+# The classification of each element is computed once at node construction (cf. `element_flags`
+# in `pama_ast`); the predicates reduce to a single bit test instead of recursing through
+# `Binding.value` chains every time they are asked.
+
 def is_seq_wildcard(node):
-    if isinstance(node, pama_ast.Wildcard):
-        return node.is_seq
-    elif isinstance(node, pama_ast.Binding):
-        return is_seq_wildcard(node.value)
-    else:
-        return False
+    return (pama_ast.element_flags(node) & pama_ast.SEQ_WILDCARD) != 0
 
 
 def is_string_element(node):
-    if isinstance(node, (pama_ast.RegularExpression, pama_ast.RegularExprType)):
-        return True
-
-    elif isinstance(node, pama_ast.Constant):
-        return type(node.value) is str
-
-    elif isinstance(node, pama_ast.Binding):
-        return is_string_element(node.value)
-
-    elif isinstance(node, pama_ast.Wildcard):
-        return True
-
-    elif isinstance(node, pama_ast.Alternatives):
-        return all([is_string_element(elt) for elt in node.elts])
-
-    else:
-        return False
+    return (pama_ast.element_flags(node) & pama_ast.STRING_ELEMENT) != 0
 
 
 def is_wildcard(node):
-    if isinstance(node, pama_ast.Wildcard):
-        return True
-    elif isinstance(node, pama_ast.Binding):
-        return is_wildcard(node.value)
-    else:
-        return False
+    return (pama_ast.element_flags(node) & pama_ast.WILDCARD) != 0
 
 
 
@@ -105,58 +145,91 @@ class PatternParser(ast.NodeTransformer):
     def __init__(self, filename: str, source_text: str):
         self.filename = filename
         self.source_text = source_text
+        self._name_cache = {}
+        self._lines = None
 
     def parse(self, node):
         if type(node) is str:
-            node = ast.parse(node)
+            node = _parse_pattern(node)
+        self._name_cache.clear()
         return self.visit(node)
 
+    def _get_name(self, node):
+        # Deconstructor patterns can share dotted names; remember resolved names per node for the
+        # duration of a single `parse`, so that revisited nodes do not walk the chain again.
+        key = id(node)
+        result = self._name_cache.get(key)
+        if result is None:
+            result = _get_name(node)
+            self._name_cache[key] = result
+        return result
+
+    def visit(self, node):
+        visitor = self._VISITORS.get(type(node))
+        if visitor is not None:
+            return visitor(self, node)
+        return self.generic_visit(node)
+
     def _syntax_error(self, msg: str, node: ast.AST):
         if hasattr(node, 'lineno') and hasattr(node, 'col_offset'):
-            line = self.source_text.split('\n')[node.lineno-1] if self.source_text is not None else None
+            # Split the source lazily and only once per parser, rather than on every error raised
+            if self._lines is None and self.source_text is not None:
+                self._lines = self.source_text.split('\n')
+            line = self._lines[node.lineno-1] if self._lines is not None else None
             return SyntaxError(msg, (self.filename, node.lineno, node.col_offset, line))
         else:
             return SyntaxError(msg)
 
     def make_binding(self, target, value):
-        if isinstance(value, ast.Name):
-            value = pama_ast.Deconstructor(name=value.id, args=[])
+        if type(value) is ast.Name:
+            value = _Deconstructor(name=value.id, args=[])
 
-        if isinstance(target, ast.Name):
+        if type(target) is ast.Name:
             name = target.id
             if name == '_':
                 return value
-            elif isinstance(value, pama_ast.Binding):
+            elif type(value) is pama_ast.Binding:
                 raise self._syntax_error("binding value to more than one name", value)
             else:
-                return pama_ast.Binding(name, value)
+                return _Binding(name, value)
 
         else:
             raise self._syntax_error("the target of a binding must be a valid name", target)
 
     def make_range_int(self, start, end):
-        if start.n < end.n:
-            items = []
-            for i in range(start.n, end.n):
-                items.append(_cl(ast.Num(n=i), start))
+        # Ranges can expand into hundreds of literal nodes; build `ast.Constant` directly (the
+        # deprecated `ast.Num` wrapper constructs one anyway) and set the location attributes
+        # in-line instead of going through `_cl` for every node.
+        s, e = start.n, end.n
+        if s < e:
+            ln, col = start.lineno, start.col_offset
+            Constant = ast.Constant
+            items = [Constant(value=i) for i in range(s, e)]
+            for n in items:
+                n.lineno = ln
+                n.col_offset = col
             items.append(end)
             return items
 
-        elif start.n == end.n:
+        elif s == e:
             return [start]
 
         else:
             return None
 
     def make_range_str(self, start, end):
-        if start.s < end.s:
-            items = []
-            for i in range(ord(start.s), ord(end.s)):
-                items.append(_cl(ast.Str(s=chr(i)), start))
+        s, e = start.s, end.s
+        if s < e:
+            ln, col = start.lineno, start.col_offset
+            Constant = ast.Constant
+            items = [Constant(value=chr(i)) for i in range(ord(s), ord(e))]
+            for n in items:
+                n.lineno = ln
+                n.col_offset = col
             items.append(end)
             return items
 
-        elif start.s == end.s:
+        elif s == e:
             return [start]
 
         else:
@@ -167,16 +240,19 @@ class PatternParser(ast.NodeTransformer):
 
     def _handle_or(self, elts, node):
         # Special case: `x @ 2 | 3` is interpreted as `x @ (2 | 3)`
-        if isinstance(elts[0], ast.BinOp) and isinstance(elts[0].op, ast.MatMult):
+        if type(elts[0]) is ast.BinOp and type(elts[0].op) is ast.MatMult:
             bind_node = elts[0]
             elts[0] = bind_node.right
             result = self._handle_or(elts, node)
             return _cl(self.make_binding(bind_node.left, result), bind_node)
 
-        # Handle the special cases `int | ... | int` and `char | ... | char`
+        # Handle the special cases `int | ... | int` and `char | ... | char`; on the way, note
+        # whether all surviving elements are plain names, so that we do not need a separate scan
+        # for the deconstructor shortcut below
         new_elts = []
+        all_names = True
         for i, elt in enumerate(elts):
-            if isinstance(elt, ast.Ellipsis):
+            if type(elt) is ast.Constant and elt.value is ...:
                 if i == 0 or i+1 == len(elts):
                     raise self._syntax_error("'...' cannot be the first or last element in alternatives", node)
                 start, stop = elts[i-1], elts[i+1]
@@ -187,34 +263,37 @@ class PatternParser(ast.NodeTransformer):
                 else:
                     items = self.make_range_str(start, stop)
                 if len(items) > 2:
-                    del items[0], items[-1]
-                    new_elts += items
+                    new_elts.extend(items[1:-1])
             else:
+                if all_names and type(elt) is not ast.Name:
+                    all_names = False
                 new_elts.append(elt)
-        elts = new_elts
 
-        # Special case: `A|B|C` is interpreted as `A()|B()|C()`
-        if all(isinstance(elt, ast.Name) for elt in elts):
-            elts = [pama_ast.Deconstructor(elt.id, []) for elt in elts]
+        # Special case: `A|B|C` is interpreted as `A()|B()|C()`; plain deconstructors can be
+        # neither wildcards nor bindings, so they need no further validation
+        if all_names:
+            elts = [_Deconstructor(elt.id, []) for elt in new_elts]
         else:
-            elts = [self.visit(elt) for elt in elts]
-
-        # There are no wildcards or name bindings allowed
-        if any(is_wildcard(elt) for elt in elts):
-            raise self._syntax_error("wildcards not allowed in alternatives", node)
-        if any(isinstance(elt, pama_ast.Binding) for elt in elts):
-            raise self._syntax_error("bindings not allowed in alternatives", node)
+            # Visit and validate in the same pass: wildcards and name bindings are not allowed
+            elts = []
+            for elt in new_elts:
+                elt = self.visit(elt)
+                if is_wildcard(elt):
+                    raise self._syntax_error("wildcards not allowed in alternatives", node)
+                if type(elt) is pama_ast.Binding:
+                    raise self._syntax_error("bindings not allowed in alternatives", node)
+                elts.append(elt)
 
         return _cl(pama_ast.Alternatives(elts=elts), node)
 
     def _handle_rep_count(self, node):
-        if isinstance(node, ast.Name):
+        if type(node) is ast.Name:
             return node.id
         elif _is_int(node):
             return node.n
-        elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        elif type(node) is ast.BinOp and type(node.op) is ast.BitOr:
             elts = _flatten_op(node, ast.BitOr)
-            if all([_is_int(elt) and elt.n >= 0 for elt in elts]):
+            if all(_is_int(elt) and elt.n >= 0 for elt in elts):
                 return [elt.n for elt in elts]
 
         self._syntax_error("invalid repetition count", node)
@@ -224,66 +303,89 @@ class PatternParser(ast.NodeTransformer):
         if len(elts) == 0:
             return _cl(pama_ast.SequencePattern([], [], [], [], 0, 0), node)
 
+        # Bind the hot lookups to locals once; the scans below run for every sequence element
+        flags_of = pama_ast.element_flags
+        seq_bit = pama_ast.SEQ_WILDCARD
+
+        # Fast path: most sequence patterns contain no `*name` wildcard at all, in which case the
+        # whole pattern is one fixed-length segment and none of the splitting below is needed
+        if not any(flags_of(elt) & seq_bit for elt in elts):
+            n = len(elts)
+            return _cl(pama_ast.SequencePattern(elts, [], [], [], n, n), node)
+
         # Split the sequence at each 'sequence wildcard'
+        Binding = pama_ast.Binding
         names = []
         sub_seqs = [[]]
+        min_length = 0
         for elt in elts:
-            if is_seq_wildcard(elt):
+            if flags_of(elt) & seq_bit:
                 sub_seqs.append([])
-                names.append(elt.target if isinstance(elt, pama_ast.Binding) else None)
+                names.append(elt.target if elt.__class__ is Binding else None)
             else:
                 sub_seqs[-1].append(elt)
+                min_length += 1
 
         while len(names) > 0 and names[-1] is None:
-            del names[-1]
+            names.pop()
 
+        # Slicing instead of `del sub_seqs[0]` avoids shifting all remaining sub-sequences down;
+        # at least one sequence wildcard got past the fast path, so `sub_seqs` cannot run empty
         left = sub_seqs[0]
-        del sub_seqs[0]
-        if len(sub_seqs) == 0:
-            exact_length = len(left) if len(left) == len(elts) else None
-            return _cl(pama_ast.SequencePattern(left, [], [], [], len(left), exact_length), node)
-        if len(left) > 0 and isinstance(left[-1], pama_ast.Wildcard):
+        sub_seqs = sub_seqs[1:]
+        if len(left) > 0 and type(left[-1]) is pama_ast.Wildcard:
             raise self._syntax_error("invalid wildcards in sequence", node)
 
         if len(sub_seqs) > 0:
-            right = sub_seqs[-1]
-            del sub_seqs[-1]
+            right = sub_seqs.pop()
         else:
             right = []
-        if len(right) > 0 and isinstance(right[0], pama_ast.Wildcard):
+        if len(right) > 0 and type(right[0]) is pama_ast.Wildcard:
             raise self._syntax_error("invalid wildcards in sequence", node)
 
+        # The common case: a single `*x` split and no interior sub-sequences left to validate
+        if len(sub_seqs) == 0:
+            return _cl(pama_ast.SequencePattern(left, right, [], names, len(left) + len(right), None), node)
+
         # Check for possible errors such as two adjacent wildcard sequences
         for item in sub_seqs:
             # An empty sub-sequence cannot be matched unambiguously
             if len(item) == 0:
                 raise self._syntax_error("invalid wildcards in sequence", node)
             # The first and last item of a sequence cannot be plain wildcards
-            if isinstance(item[0], pama_ast.Wildcard) or isinstance(item[-1], pama_ast.Wildcard):
+            if type(item[0]) is pama_ast.Wildcard or type(item[-1]) is pama_ast.Wildcard:
                 raise self._syntax_error("invalid wildcards in sequence", node)
             # If there are only wildcards here, we cannot identify the sub-sequence later on
             if all(is_wildcard(elt) for elt in item):
                 raise self._syntax_error("invalid wildcards in sequence", node)
 
-        min_length = len(left) + len(right) + sum([len(item) for item in sub_seqs])
+        # `min_length` was accumulated in the split loop above: every non-wildcard element ends up
+        # in exactly one of `left`, `right` or `sub_seqs`
         return _cl(pama_ast.SequencePattern(left, right, sub_seqs, names, min_length, None), node)
 
     def _handle_str_seq(self, node, elts: list):
-        elts = [self.visit(elt) for elt in elts]
+        # Visit and validate in a single pass instead of walking the flattened list twice
+        visited = []
         for elt in elts:
+            elt = self.visit(elt)
             if not is_string_element(elt):
                 raise self._syntax_error(f"invalid element in string sequence: '{repr(elt)}'", node)
+            visited.append(elt)
+        elts = visited
+        flags_of = pama_ast.element_flags
+        wild_bit = pama_ast.WILDCARD
+        Binding = pama_ast.Binding
         names = [ None ]
         sub_seqs = [[]]
         for elt in elts:
-            if is_wildcard(elt):
+            if flags_of(elt) & wild_bit:
                 sub_seqs.append([])
-                names.append(elt.target if isinstance(elt, pama_ast.Binding) else None)
+                names.append(elt.target if elt.__class__ is Binding else None)
             else:
                 sub_seqs[-1].append(elt)
 
         while len(names) > 0 and names[-1] is None:
-            del names[-1]
+            names.pop()
 
         # Check for possible errors such as two adjacent wildcard sequences
         for i, item in enumerate(sub_seqs):
@@ -293,7 +395,7 @@ class PatternParser(ast.NodeTransformer):
                     raise self._syntax_error("invalid wildcards in sequence", node)
                 continue
             # The first and last item of a group cannot be plain wildcards
-            if isinstance(item[0], pama_ast.Wildcard) or isinstance(item[-1], pama_ast.Wildcard):
+            if type(item[0]) is pama_ast.Wildcard or type(item[-1]) is pama_ast.Wildcard:
                 raise self._syntax_error("invalid wildcards in sequence", node)
             # If there are only wildcards here, we cannot identify the sub-sequence later on
             if all(is_wildcard(elt) for elt in item):
@@ -301,9 +403,9 @@ class PatternParser(ast.NodeTransformer):
 
         fixed_start = len(sub_seqs[0]) > 0
         if not fixed_start:
-            del sub_seqs[0]
+            sub_seqs = sub_seqs[1:]
             if len(names) > 0:
-                del names[0]
+                names = names[1:]
             if len(sub_seqs) == 0:
                 raise self._syntax_error("invalid string sequence", node)
 
@@ -313,8 +415,8 @@ class PatternParser(ast.NodeTransformer):
         return node
 
     def visit_Attribute(self, node: ast.Attribute):
-        name = _get_name(node)
-        return pama_ast.Deconstructor(name, [])
+        name = self._get_name(node)
+        return _Deconstructor(name, [])
 
     def visit_AttributeDestructor(self, node: pama_ast.AttributeDeconstructor):
         return node
@@ -323,24 +425,26 @@ class PatternParser(ast.NodeTransformer):
         return node
 
     def visit_BinOp(self, node: ast.BinOp):
-        op = node.op
-        if isinstance(op, ast.Add):
+        # The operator node types are concrete leaf classes, so dispatching on the exact type
+        # needs just one pointer comparison per branch
+        op = type(node.op)
+        if op is ast.Add:
             elts = _flatten_op(node, ast.Add)
             return self._handle_str_seq(node, elts)
 
-        elif isinstance(op, ast.BitOr):
+        elif op is ast.BitOr:
             elts = _flatten_op(node, ast.BitOr)
             return self._handle_or(elts, node)
 
-        elif isinstance(op, (ast.BitXor, ast.Pow)):
+        elif op is ast.BitXor or op is ast.Pow:
             value = self.visit(node.left)
             rep_count = self._handle_rep_count(node.right)
             return pama_ast.SequenceRepetition(value, rep_count)
 
-        elif isinstance(op, ast.MatMult):
+        elif op is ast.MatMult:
             # Special case: `a @ b` is interpreted as `a @ b()`
-            if isinstance(node.right, ast.Name):
-                right = pama_ast.Deconstructor(node.right.id, [])
+            if type(node.right) is ast.Name:
+                right = _Deconstructor(node.right.id, [])
                 return _cl(self.make_binding(node.left, right), node)
             else:
                 return _cl(self.make_binding(node.left, self.visit(node.right)), node)
@@ -349,9 +453,9 @@ class PatternParser(ast.NodeTransformer):
             raise self._syntax_error(f"operator '{type(node.op)}' not supported in pattern matching", node.op)
 
     def visit_Call(self, node: ast.Call):
-        name = _get_name(node.func)
+        name = self._get_name(node.func)
         if len(node.keywords) == 0:
-            return pama_ast.Deconstructor(name, [self.visit(arg) for arg in node.args])
+            return _Deconstructor(name, [self.visit(arg) for arg in node.args])
 
         elif len(node.args) == 0:
             return pama_ast.AttributeDeconstructor(name, {arg.arg: self.visit(arg.value) for arg in node.keywords})
@@ -370,14 +474,11 @@ class PatternParser(ast.NodeTransformer):
             raise self._syntax_error("empty dict makes no sense here", node)
         keys = []
         for key in node.keys:
-            if isinstance(key, ast.Str):
-                value = key.s
-            elif isinstance(key, ast.Num):
-                value = key.n
-            elif isinstance(key, ast.NameConstant):
+            if type(key) is ast.Constant and type(key.value) in _DICT_KEY_TYPES:
                 value = key.value
-            elif isinstance(key, ast.Tuple) and all([isinstance(elt, ast.Num) for elt in key.elts]):
-                value = tuple([elt.n for elt in key.elts])
+            elif type(key) is ast.Tuple and \
+                    all(type(elt) is ast.Constant and type(elt.value) in _NUM_TYPES for elt in key.elts):
+                value = tuple(elt.value for elt in key.elts)
             else:
                 raise self._syntax_error("only keys of type 'str' or 'int' are supported in dicts", node)
             keys.append(_cl(ast.Constant(value=value), key))
@@ -385,7 +486,7 @@ class PatternParser(ast.NodeTransformer):
         return _cl(ast.Dict(keys=keys, values=values), node)
 
     def visit_Ellipsis(self, node: ast.Ellipsis):
-        return _cl(pama_ast.Wildcard(is_seq=True), node)
+        return _WILDCARD_SEQ
 
     def visit_Expr(self, node: ast.Expr):
         return self.visit(node.value)
@@ -402,53 +503,73 @@ class PatternParser(ast.NodeTransformer):
 
     def visit_Name(self, node: ast.Name):
         name = node.id
-        result = _cl(pama_ast.Wildcard(is_seq=False), node)
         if name != '_':
-            result = _cl(pama_ast.Binding(target=name, value=result), node)
-        return result
+            return _cl(_Binding(target=name, value=_WILDCARD_ELT), node)
+        return _WILDCARD_ELT
 
     def visit_NameConstant(self, node: ast.NameConstant):
-        return _cl(pama_ast.Constant(value=node.value), node)
+        return _cl(_Constant(value=node.value), node)
 
     def visit_Num(self, node: ast.Num):
-        return _cl(pama_ast.Constant(value=node.n), node)
+        return _cl(_Constant(value=node.n), node)
 
     def visit_Set(self, node: ast.Set):
         if len(node.elts) == 1:
             elt = node.elts[0]
-            if isinstance(elt, ast.Str):
-                return _cl(pama_ast.RegularExpression(pattern=elt.s), node)
+            if type(elt) is ast.Constant and type(elt.value) is str:
+                return _cl(pama_ast.RegularExpression(pattern=elt.value), node)
 
-            elif isinstance(elt, ast.Name):
+            elif type(elt) is ast.Name:
                 name = elt.id
-                if name in ('bool', 'float', 'int',
-                            'alnum', 'alpha', 'ascii', 'decimal', 'digit', 'identifier', 'lower',
-                            'numeric', 'printable', 'space', 'title', 'upper'):
+                if name in _REGEX_TYPE_NAMES:
                     return _cl(pama_ast.RegularExprType(type_name=name), node)
-                elif name in ('name', 'whitespace', ):
-                    value = {
-                        'name':  r'[A-Za-z_]\w+',
-                        'whitespace': r'\s+',
-                    }[name]
-                    return _cl(pama_ast.RegularExpression(pattern=value), node)
+                elif name in _REGEX_NAMED_PATTERNS:
+                    return _cl(pama_ast.RegularExpression(pattern=_REGEX_NAMED_PATTERNS[name]), node)
 
         self.generic_visit(node)
 
     def visit_Starred(self, node: ast.Starred):
-        if isinstance(node.value, ast.Name):
+        if type(node.value) is ast.Name:
             name = node.value.id
-            result = _cl(pama_ast.Wildcard(is_seq=True), node.value)
             if name != '_':
-                result = _cl(pama_ast.Binding(name, result), node)
-            return result
+                return _cl(_Binding(name, _WILDCARD_SEQ), node)
+            return _WILDCARD_SEQ
 
         raise self._syntax_error(f"can't assign to '{type(node)}'", node)
 
     def visit_Str(self, node: ast.Str):
-        return _cl(pama_ast.Constant(value=node.s), node)
+        return _cl(_Constant(value=node.s), node)
 
     def visit_Tuple(self, node: ast.Tuple):
         return self._handle_seq(node)
 
     def visit_Wildcard(self, node: pama_ast.Wildcard):
         return node
+
+    # Dispatching `visit` through this table replaces `NodeVisitor`'s per-node string concatenation
+    # and `getattr` with a single dict lookup.  It also routes the pattern-specific node types to
+    # their visitors, whose names do not all follow the `visit_<classname>` convention.
+    _VISITORS = {
+        ast.Attribute: visit_Attribute,
+        ast.BinOp: visit_BinOp,
+        ast.Call: visit_Call,
+        ast.Constant: visit_Constant,
+        ast.Dict: visit_Dict,
+        ast.Ellipsis: visit_Ellipsis,
+        ast.Expr: visit_Expr,
+        ast.List: visit_List,
+        ast.Module: visit_Module,
+        ast.Name: visit_Name,
+        ast.NameConstant: visit_NameConstant,
+        ast.Num: visit_Num,
+        ast.Set: visit_Set,
+        ast.Starred: visit_Starred,
+        ast.Str: visit_Str,
+        ast.Tuple: visit_Tuple,
+        pama_ast.Alternatives: visit_Alternatives,
+        pama_ast.AttributeDeconstructor: visit_AttributeDestructor,
+        pama_ast.Binding: visit_Binding,
+        pama_ast.Deconstructor: visit_Deconstructor,
+        pama_ast.SequencePattern: visit_ListPattern,
+        pama_ast.Wildcard: visit_Wildcard,
+    }
@@ -6,10 +6,40 @@
 #
 # License: Apache 2.0
 #
-import datetime, io, os.path, tokenize, types
+import datetime, io, itertools, os.path, re, tokenize, types
+from array import array
 from . import pama_compiler
 
 
+# How each bracket token changes the nesting depth; a single hash lookup per token replaces two
+# tuple-membership scans.
+_BRACKET_DELTA = {'(': 1, '[': 1, '{': 1, ')': -1, ']': -1, '}': -1}
+
+# Counter for the generated `CaseN` class names; `itertools.count` increments at C level and is
+# safe even if several scanners run concurrently.
+_name_counter = itertools.count(1)
+
+# Quick pre-filter for sources without any pattern matching: the keywords `match` and `case` are
+# only recognised at the very beginning of a (logical) line, and any such line necessarily starts
+# with optional whitespace followed by the keyword.  The regex scans the text at C speed, so a
+# file without pattern matching never needs to be tokenized at all.  A hit inside a string or a
+# bracketed continuation line is a harmless false positive: the tokenizer then finds nothing.
+_KW_RE = re.compile(r'(?m)^[ \t]*(?:match|case)\b')
+
+# Almost every line-start token is neither `match` nor `case`; a single frozenset lookup rejects
+# them before any further string comparisons.  The second set holds the token types after which a
+# new (logical) line begins.
+_MATCH_KEYWORDS = frozenset(('match', 'case'))
+_LINE_START_TYPES = frozenset((tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT))
+
+# The match template is prepended to every generated `__match__` module; read it exactly once at
+# import time, so that compiling many sources does not re-read the same file over and over.
+_TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), 'match_template.py')
+with open(_TEMPLATE_PATH, encoding='utf-8') as _f:
+    _MATCH_TEMPLATE = _f.read()
+del _f
+
+
 class CaseStatement(object):
     """
     A `case` statement represents a line of the form `case ...:`.
@@ -32,8 +62,6 @@ class CaseStatement(object):
     `case BinOp(Num(x), Add(), Num(y)) if x == y:`, which tests if both numbers in the binary operation are equal.
     """
 
-    _name_index = 0
-
     def __init__(self,
                  compiler,
                  start_pos,
@@ -41,24 +69,31 @@ class CaseStatement(object):
                  value: str,
                  pattern: str,
                  guard: str):
-        self.__class__._name_index += 1
         self.compiler = compiler
         self.start_pos = start_pos
         self.end_pos = end_pos
         self.value = value
         self.pattern = pattern
         self.guard = guard
-        self.name = f"Case{self.__class__._name_index}"
+        self.name = f"Case{next(_name_counter)}"
+        # The leading part of the replacement depends only on the class name; build it once here
+        # so that `render` only has to fill in the value, sources, and targets
+        self._with_prefix = f"with __match__.{self.name}("
+        self._rendered = None
         self.code = None
 
     def __repr__(self):
         return f"case ({self.value} as {self.pattern} if {self.guard}) @ {repr(self.start_pos)}"
 
-    def apply(self, text: str):
+    def render(self):
         """
-        Replace the original `case` statement in the source code by a `with` statement, and return the modified
-        text/source code.
+        Compile the pattern and return the `with` statement that replaces the original `case` statement in the
+        source code.
         """
+        # Compiling the pattern and formatting the replacement are both deterministic, so repeated
+        # calls (incremental compilation, tests) can simply reuse the first result
+        if self._rendered is not None:
+            return self._rendered
         self.code = self.compiler.create_class(self.pattern, self.name, self.guard)
         targets = self.compiler.get_targets()
         value = '__matchvalue__' if self.value is None else f"[{self.value}, False]"
@@ -69,12 +104,8 @@ class CaseStatement(object):
         sources = ', '.join([key + '=' + key for key in self.compiler.sources])
         if sources != '':
             sources = ', ' + sources
-        result = [
-            text[:self.start_pos],
-            f"with __match__.{self.name}({value}{sources}) as {dest_vars}:",
-            text[self.end_pos:]
-        ]
-        return ''.join(result)
+        self._rendered = f"{self._with_prefix}{value}{sources}) as {dest_vars}:"
+        return self._rendered
 
 
 class MatchStatement(object):
@@ -99,65 +130,11 @@ class MatchStatement(object):
     def __repr__(self):
         return f"match @ {repr(self.start_pos)}({self.value})"
 
-    def apply(self, text: str):
+    def render(self):
         """
-        Replace the original `match` statement in the source code by a `with` statement, and return the modified
-        text/source code.
+        Return the `with` statement that replaces the original `match` statement in the source code.
         """
-        result = [
-            text[:self.start_pos],
-            f"with __match__.Match([{self.value}]) as __matchvalue__:",
-            text[self.end_pos:]
-        ]
-        return ''.join(result)
-
-
-class TokenStream(object):
-    """
-    The `TokenStream` is basically a glorified iterator with look-ahead.  It allows you to peek at the next element
-    through the `head` field, removes comments from the stream, and keeps track of the depth of brackets/parentheses
-    and indentation.
-    """
-
-    def __init__(self, source):
-        self.source = iter(source)
-        self.bracket_depth = 0
-        self.indent_depth = 0
-        self._cache = None
-
-    def _get_cache(self):
-        if self._cache is None:
-            try:
-                token = next(self.source)
-                if hasattr(token, 'type'):
-                    if token.type == tokenize.COMMENT:
-                        return self._get_cache()
-                    elif token.type == tokenize.INDENT:
-                        self.indent_depth += 1
-                    elif token.type == tokenize.DEDENT:
-                        self.indent_depth -= 1
-                if hasattr(token, 'string'):
-                    if token.string in ('(', '[', '{'):
-                        self.bracket_depth += 1
-                    elif token.string in (')', ']', '}'):
-                        self.bracket_depth -= 1
-                self._cache = token
-            except StopIteration:
-                pass
-        return self._cache
-
-    @property
-    def has_next(self):
-        return self._get_cache() is not None
-
-    @property
-    def head(self):
-        return self._get_cache()
-
-    def next(self):
-        result = self._get_cache()
-        self._cache = None
-        return result
+        return f"with __match__.Match([{self.value}]) as __matchvalue__:"
 
 
 class TextScanner(object):
@@ -171,8 +148,8 @@ class TextScanner(object):
     The process works in three steps.  As a first step, the scanner finds all occurrences of `match`, and `case`,
     respectively, and roughly parses the statements (it looks for `as` and `if` keywords, in particular).  As a
     second step, the `case` statements are compiled to perform the pattern matching (this is done in other modules
-    and not here).  As a third and last step, the algorithm iterates over all found statements in reverse order, and
-    replaces each one by an appropriate `with` statement.
+    and not here).  As a third and last step, the algorithm walks over all found statements in source order, and
+    stitches the text back together with each statement replaced by an appropriate `with` statement.
 
     The compilation between steps one and three is necessary, because we need to know the names of variables defined
     by the pattern, as well as the local names used by the pattern.  If a pattern uses the names `foo` and `y`, and
@@ -187,12 +164,61 @@ class TextScanner(object):
         self.filename = filename
         self.source = source_text
         self.compiler = pama_compiler.Compiler(filename, source_text)
-        self._token_list = list(tokenize.tokenize(io.BytesIO(self.source.encode('utf-8')).readline))
         self._statements = []
-        self._line_starts = [0]
-        for i, c in enumerate(self.source):
-            if c == '\n':
-                self._line_starts.append(i+1)
+        if _KW_RE.search(source_text) is None:
+            # No line can possibly start with `match` or `case`, so the source passes through
+            # unchanged and all the tokenizing work below would be for nothing
+            return
+        # `generate_tokens` reads the source string directly; `tokenize.tokenize` would require a
+        # UTF-8 encoded copy of the whole text first.  Note that there is no ENCODING token then,
+        # so the statement scanner must treat the very first token as the start of a line itself.
+        self._token_list = list(tokenize.generate_tokens(io.StringIO(self.source).readline))
+        # Comments never contribute to the statement structure: filter them out once, and record
+        # the bracket and indentation depth after each remaining token.  The scanning methods
+        # below then work with plain list indexing instead of a stateful look-ahead stream, which
+        # costs several method and property calls per token.
+        tokens = []
+        depths = array('i')
+        indents = array('i')
+        bracket = 0
+        indent = 0
+        for token in self._token_list:
+            t = token.type
+            if t == tokenize.COMMENT:
+                continue
+            elif t == tokenize.INDENT:
+                indent += 1
+            elif t == tokenize.DEDENT:
+                indent -= 1
+            else:
+                delta = _BRACKET_DELTA.get(token.string)
+                if delta is not None:
+                    bracket += delta
+            tokens.append(token)
+            depths.append(bracket)
+            indents.append(indent)
+        self._tokens = tokens
+        self._depths = depths
+        self._indents = indents
+        # For every token, the index of the next token at bracket depth zero; lets the parse
+        # loops leave a bracketed region in one jump instead of stepping token by token
+        jump = [0] * len(tokens)
+        nxt = len(tokens)
+        for i in range(len(tokens) - 1, -1, -1):
+            if depths[i] == 0:
+                nxt = i
+            jump[i] = nxt
+        self._depth0_jump = array('i', jump)
+        # Locate the line starts with `str.find`, which scans at C speed, instead of walking the
+        # source character by character in Python
+        line_starts = [0]
+        find = self.source.find
+        i = find('\n')
+        while i >= 0:
+            line_starts.append(i + 1)
+            i = find('\n', i + 1)
+        # Stored as a compact int array: one machine int per line instead of a boxed Python int
+        self._line_starts = array('i', line_starts)
         self.find_statements()
 
     def get_text_position(self, pos):
@@ -202,17 +228,30 @@ class TextScanner(object):
         row, col = pos
         return self._line_starts[row-1] + col
 
-    def parse_case(self, token_stream: TokenStream):
-        case_token = token_stream.next()
-        assert case_token.string == 'case'
+    def parse_case(self, i: int):
+        """
+        Parse the `case` statement whose keyword sits at token index `i`; returns the statement
+        together with the index of the first token after it.
+        """
+        tokens = self._tokens
+        depths = self._depths
+        jump = self._depth0_jump
+        n = len(tokens)
+        # The caller dispatches here only after seeing the `case` keyword, so the token needs
+        # no re-checking
+        case_token = tokens[i]
+        i += 1
         value = None
         pattern = None
         guard = None
         start = self.get_text_position(case_token.end)
-        while token_stream.has_next:
-            while token_stream.has_next and token_stream.bracket_depth > 0:
-                token_stream.next()
-            token = token_stream.next()
+        while i < n:
+            if depths[i] > 0:
+                i = jump[i]
+                if i >= n:
+                    break
+            token = tokens[i]
+            i += 1
             if token.string == 'as' and value is None:
                 value = self.source[start:self.get_text_position(token.start)].strip()
                 start = self.get_text_position(token.end)
@@ -221,7 +260,7 @@ class TextScanner(object):
                 pattern = self.source[start:self.get_text_position(token.start)].strip()
                 start = self.get_text_position(token.end)
 
-            elif token.string == ':' and token_stream.head.type in (tokenize.NL, tokenize.NEWLINE):
+            elif token.string == ':' and tokens[i].type in (tokenize.NL, tokenize.NEWLINE):
                 s = self.source[start:self.get_text_position(token.start)].strip()
                 if pattern is None:
                     pattern = s
@@ -229,60 +268,81 @@ class TextScanner(object):
                     guard = s
                 start_pos = self.get_text_position(case_token.start)
                 end_pos = self.get_text_position(token.end)
-                return CaseStatement(self.compiler, start_pos, end_pos, value, pattern, guard)
+                return CaseStatement(self.compiler, start_pos, end_pos, value, pattern, guard), i
 
         raise SyntaxError("unexpected EOF while scanning 'case'")
 
-    def parse_match(self, token_stream: TokenStream):
-        match_token = token_stream.next()
-        assert match_token.string == 'match'
-        while token_stream.has_next:
-            while token_stream.has_next and token_stream.bracket_depth > 0:
-                token_stream.next()
-            token = token_stream.next()
+    def parse_match(self, i: int):
+        """
+        Parse the `match` statement whose keyword sits at token index `i`; returns the statement
+        together with the index of the first token after it.
+        """
+        tokens = self._tokens
+        depths = self._depths
+        jump = self._depth0_jump
+        n = len(tokens)
+        # The caller dispatches here only after seeing the `match` keyword, so the token needs
+        # no re-checking
+        match_token = tokens[i]
+        i += 1
+        while i < n:
+            if depths[i] > 0:
+                i = jump[i]
+                if i >= n:
+                    break
+            token = tokens[i]
+            i += 1
             if token.string == ':':
                 start_pos = self.get_text_position(match_token.start)
                 end_pos = self.get_text_position(token.end)
                 value = self.source[self.get_text_position(match_token.end):self.get_text_position(token.start)].strip()
-                return MatchStatement(start_pos, end_pos, value)
+                return MatchStatement(start_pos, end_pos, value), i
 
         raise SyntaxError("unexpected EOF while scanning 'match'")
 
     def find_statements(self):
-        token_stream = TokenStream(self._token_list)
+        tokens = self._tokens
+        indents = self._indents
+        n = len(tokens)
         # The `match_indent` is used to keep track if we are inside the suite of a `match`.  This is needed because the
         # `case` statement slightly vary in syntax and meaning, depending on whether they are inside a `match` or not.
         match_indent = -1
-        while token_stream.has_next:
-            token = token_stream.next()
-            # We only look for `match` and `case` at the very beginning of a line.
-            if token.type in (tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT, tokenize.ENCODING):
-                token = token_stream.head
-                if token is None:
-                    break
-
-                elif token.string == 'match':
+        i = 0
+        # We only look for `match` and `case` at the very beginning of a line; without an ENCODING
+        # token, the first token of the file is a line start as well.
+        new_line = True
+        while i < n:
+            token = tokens[i]
+            if new_line:
+                keyword = token.string in _MATCH_KEYWORDS
+                if keyword and token.string == 'match':
                     # At the moment, we cannot nest `match` because we need to store the value to match against in
                     # a local variable, which would be overriden by nested match-statements.
                     if match_indent != -1:
                         raise SyntaxError("'match' cannot be nested")
-                    match_indent = token_stream.indent_depth
-                    match = self.parse_match(token_stream)
+                    match_indent = indents[i]
+                    match, i = self.parse_match(i)
                     self._statements.append(match)
+                    new_line = False
+                    continue
 
-                elif token.string == 'case':
-                    indent = token_stream.indent_depth
-                    case = self.parse_case(token_stream)
+                elif keyword:
+                    indent = indents[i]
+                    case, i = self.parse_case(i)
                     self._statements.append(case)
                     # The `case` statements must have a value exactly iff it is not inside a `match` suite.
                     if match_indent != indent-1 and case.value is None:
                         raise SyntaxError("'case' without value outside 'match'")
                     elif match_indent >= 0 and case.value is not None:
                         raise SyntaxError("'case' with value inside 'match'")
+                    new_line = False
+                    continue
 
                 elif token.type in (tokenize.DEDENT, tokenize.INDENT):
-                    if token_stream.indent_depth <= match_indent:
+                    if indents[i] <= match_indent:
                         match_indent = -1
+            new_line = token.type in _LINE_START_TYPES
+            i += 1
 
     def get_match_code(self):
         """
@@ -293,9 +353,7 @@ class TextScanner(object):
                 "# Auxiliary module for pattern matching (PyMa)\n"
                 "# Created: " + str(datetime.datetime.now()),
             ]
-            name = os.path.join(os.path.dirname(__file__), 'match_template.py')
-            with open(name) as f:
-                result.append(''.join(list(f.readlines())))
+            result.append(_MATCH_TEMPLATE)
             for stmt in self._statements:
                 if stmt.code is not None:
                     result.append(stmt.code)
@@ -322,7 +380,16 @@ class TextScanner(object):
         Returns the source code text, where all the `match` and `case` statements have been replaced by appropriate
         `with` statements.
         """
-        text = self.source
-        for stmt in reversed(self._statements):
-            text = stmt.apply(text)
-        return text
+        # The statements were found in source order, so the text can be assembled in a single
+        # forward pass; the old approach spliced the whole source anew for every statement.
+        if len(self._statements) == 0:
+            return self.source
+        parts = []
+        prev = 0
+        source = self.source
+        for stmt in self._statements:
+            parts.append(source[prev:stmt.start_pos])
+            parts.append(stmt.render())
+            prev = stmt.end_pos
+        parts.append(source[prev:])
+        return ''.join(parts)